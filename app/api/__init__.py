@@ -0,0 +1,9 @@
+"""HTTP API package.
+
+`IMPORTED_AT` is taken when the package is first imported, before `main`
+imports its routes, so /health's `startup_ms` covers import time as well.
+"""
+
+import time
+
+IMPORTED_AT = time.perf_counter()
@@ -0,0 +1,42 @@
+"""Deferred router loading for rarely used subsystems.
+
+`LazyRouters` is an ASGI middleware that imports a router module and includes
+it in the app the first time a request hits its path prefix (or the API docs
+are requested), so the import cost is not paid on every process start.
+"""
+
+import importlib
+
+from fastapi import FastAPI
+
+_DOCS_PATHS = ("/openapi.json", "/docs", "/redoc")
+
+
+class LazyRouters:
+    def __init__(self, app, routers: list[tuple[str, str, str]], prefix: str = "/api/v1"):
+        """`routers` is a list of (path prefix, module name, tag)."""
+        self.app = app
+        self.prefix = prefix
+        self.pending = list(routers)
+
+    def _load(self, target: FastAPI, entries: list[tuple[str, str, str]]) -> None:
+        for entry in entries:
+            _, module_name, tag = entry
+            module = importlib.import_module(module_name)
+            target.include_router(module.router, prefix=self.prefix, tags=[tag])
+            self.pending.remove(entry)
+        target.openapi_schema = None  # regenerate docs with the new routes
+
+    async def __call__(self, scope, receive, send):
+        if self.pending and scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            root = scope.get("root_path", "")
+            if root and path.startswith(root):
+                path = path[len(root):]
+            if path in _DOCS_PATHS:
+                self._load(scope["app"], list(self.pending))
+            else:
+                due = [e for e in self.pending if path.startswith(e[0])]
+                if due:
+                    self._load(scope["app"], due)
+        await self.app(scope, receive, send)
@@ -1,14 +1,26 @@
+import logging
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.database import init_db
-from app.api.routes import curriculum, characters, import_data, ask, learners
+from app.api import IMPORTED_AT
+from app.api.lazy import LazyRouters
+from app.core.config import PROFILE_TOKEN, STARTUP_BUDGET_MS
+from app.core.database import engine, init_db
+from app.api.routes import analyze, curriculum, characters, learners, sync
+
+logger = logging.getLogger(__name__)
+startup = {"startup_ms": None, "schema_version": None}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    startup["schema_version"] = await init_db()
+    startup["startup_ms"] = round((time.perf_counter() - IMPORTED_AT) * 1000, 1)
+    if startup["startup_ms"] > STARTUP_BUDGET_MS:
+        logger.warning("Startup took %.0f ms (budget %.0f ms)",
+                       startup["startup_ms"], STARTUP_BUDGET_MS)
     yield
 
 
@@ -20,6 +32,11 @@ app = FastAPI(
     root_path="/knowledgebase",
 )
 
+profiling = bool(PROFILE_TOKEN)  # sampling also requires the token (checked in config)
+if profiling:  # not even imported otherwise, so disabled profiling costs nothing
+    from app.core.profiling import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware, engine=engine)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -27,13 +44,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rarely used subsystems are imported on their first request
+app.add_middleware(LazyRouters, routers=[
+    ("/api/v1/import", "app.api.routes.import_data", "import"),
+    ("/api/v1/ask", "app.api.routes.ask", "ask"),
+    *([("/api/v1/profiles", "app.api.routes.profiles", "profiles")] if profiling else []),
+])
+
 app.include_router(curriculum.router, prefix="/api/v1", tags=["curriculum"])
 app.include_router(characters.router, prefix="/api/v1", tags=["characters"])
-app.include_router(import_data.router, prefix="/api/v1", tags=["import"])
-app.include_router(ask.router, prefix="/api/v1", tags=["ask"])
 app.include_router(learners.router, prefix="/api/v1", tags=["learners"])
+app.include_router(sync.router, prefix="/api/v1", tags=["sync"])
+app.include_router(analyze.router, prefix="/api/v1", tags=["analyze"])
 
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "service": "knowledge-base"}
+    return {"status": "healthy", "service": "knowledge-base", **startup}
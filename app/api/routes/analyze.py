@@ -0,0 +1,85 @@
+"""Passage readability: how much of a text a reader already knows."""
+
+import asyncio
+from collections import Counter
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_session
+from app.core.known_sets import curriculum_characters, mastered_characters
+from app.core.segmenter import Segmenter, get_segmenter, han_chars
+
+router = APIRouter()
+
+
+class AnalyzeRequest(BaseModel):
+    text: str | list[str]  # one passage or a batch
+    # Curriculum slice: everything taught up to this point
+    grade: Optional[int] = None
+    volume: Optional[int] = None
+    up_to_lesson: Optional[int] = None  # unit*100 + lesson, e.g. 203
+    # And/or a learner's mastered characters
+    learner: Optional[str] = None
+    skill: str = "read"
+    pre_teach_limit: int = Field(default=20, ge=0, le=500)
+    segments: bool = False  # include the segmented tokens
+
+
+def _analyze(seg: Segmenter, passage: str, known: set[str], limit: int, segments: bool) -> dict:
+    tokens = seg.segment(passage)
+    chars = Counter(han_chars(passage))
+    total = sum(chars.values())
+    known_total = sum(n for c, n in chars.items() if c in known)
+    # Words containing an unknown character, most frequent in the passage first
+    unknown = Counter(t for t, _, _ in tokens if not known.issuperset(t))
+
+    result = {
+        "chars": total,
+        "known_chars": known_total,
+        "coverage": round(known_total / total, 4) if total else None,
+        "unique_chars": len(chars),
+        "unique_known": sum(1 for c in chars if c in known),
+        "tokens": len(tokens),
+        "unknown_tokens": sum(unknown.values()),
+        "pre_teach": [
+            {"word": w, "pinyin": seg.pinyin.get(w), "count": n, "in_vocab": w in seg.pinyin}
+            for w, n in unknown.most_common(limit)
+        ],
+    }
+    if segments:
+        result["segments"] = [t for t, _, _ in tokens]
+    return result
+
+
+@router.post("/analyze/text")
+async def analyze_text(data: AnalyzeRequest, db: AsyncSession = Depends(get_session)):
+    """Character coverage and pre-teach words for one or more passages.
+
+    Each passage is segmented by longest match against the vocabulary.
+    Coverage is the share of Han characters (with repeats) in the known set:
+    the curriculum up to grade/volume/up_to_lesson, the learner's mastered
+    characters, or both. The known set and segmenter are built once per
+    request, however many passages it carries.
+    """
+    if data.grade is None and (data.volume is not None or data.up_to_lesson is not None):
+        raise HTTPException(status_code=400, detail="volume and up_to_lesson require grade")
+    if data.grade is None and not data.learner:
+        raise HTTPException(status_code=400, detail="Provide a curriculum slice (grade) or a learner")
+
+    known: set[str] = set()
+    if data.grade is not None:
+        known |= await curriculum_characters(db, data.grade, data.volume, data.up_to_lesson)
+    if data.learner:
+        known |= await mastered_characters(db, data.learner, data.skill)
+
+    seg = await get_segmenter(db)
+    passages = [data.text] if isinstance(data.text, str) else data.text
+
+    # CPU-bound; a large batch runs off the event loop (the segmenter is read-only)
+    def run():
+        return [_analyze(seg, p, known, data.pre_teach_limit, data.segments) for p in passages]
+
+    return {"known_count": len(known), "results": await asyncio.to_thread(run)}
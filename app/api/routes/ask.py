@@ -1,104 +1,26 @@
-"""Natural language to SQL endpoint powered by Claude on Bedrock."""
+"""Natural language to SQL endpoint powered by Claude (Bedrock or a recorded stand-in).
 
+Common question shapes are answered locally from SQL templates (see
+`app.core.intents`); only unmatched questions reach the LLM.
+"""
+
+import logging
 import re
+import time
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
 from app.core.database import get_session
-from app.core.config import BEDROCK_BEARER_TOKEN, BEDROCK_MODEL
+from app.core.intents import resolve
+from app.core.llm import get_provider
+from app.core.schema_prompt import build_system
 
 router = APIRouter()
-
-DB_SCHEMA = """
-Tables in the knowledge base SQLite database:
-
-lessons (id INTEGER PK AUTO, grade INT, volume INT, unit_number INT, unit_title TEXT, lesson_number INT, title TEXT, page_start INT, page_end INT)
-  -- grade: 1-6. volume: 1=上册, 2=下册. e.g. grade=4, volume=1 = 四年级上册
-  -- unit_title: e.g. '课文（一）', '识字', '汉语拼音（一）'
-  -- Filter by textbook: WHERE grade=4 AND volume=1
-
-
-words (word TEXT PK, pinyin TEXT, meaning TEXT, standard_level INT, cumulative_percent REAL, radical TEXT, decomposition TEXT, etymology_type TEXT, phonetic TEXT, semantic TEXT)
-  -- Unified table for both single characters (e.g. '人') and phrases (e.g. '人民')
-  -- Single characters: length(word) = 1. Phrases: length(word) > 1.
-  -- standard_level: 《通用规范汉字表》level — 1=常用(top 3500), 2=次常用(3501-6500), 3=rare(6501+)
-  -- cumulative_percent: cumulative text coverage. LOWER = MORE common.
-  --   IMPORTANT: many words have NULL cumulative_percent. Always filter with "cumulative_percent IS NOT NULL" when querying by frequency.
-  --   "Top N most common" = ORDER BY cumulative_percent ASC LIMIT N
-  -- radical: the character's radical (部首), e.g. '氵' for 河. Only for single characters.
-  -- decomposition: IDS decomposition, e.g. '⿰氵可' for 河. ⿰=left-right, ⿱=top-bottom, ⿴=surround, etc.
-  -- etymology_type: 'pictographic' (象形), 'ideographic' (会意), 'pictophonetic' (形声)
-  -- phonetic: the phonetic component for pictophonetic characters, e.g. '可' for 河
-  -- semantic: the semantic component, e.g. '氵' for 河
-  -- non_radical: the distinctive component (decomposition minus radical), e.g. '寺' for 待(⿰彳寺)
-  -- To find characters with same radical: WHERE radical = '氵' AND length(word) = 1
-  -- To find characters with same phonetic: WHERE phonetic = '青' AND length(word) = 1
-  -- non_radical: the distinctive component (decomposition minus radical), e.g. '寺' for 待(⿰彳寺)
-  -- components: space-separated list of ALL sub-characters (recursive). e.g. 待 = '一 丨 十 土 寸 寺 彳'
-  -- To find similar-looking characters (形近字): match on non_radical. e.g. for 待, find WHERE non_radical = '寺' → 持诗特等峙侍
-  -- To find characters containing a component: WHERE components LIKE '% 寺 %' OR components LIKE '寺 %' OR components LIKE '% 寺'
-
-word_lessons (word TEXT FK→words, lesson_id INT FK→lessons, requirement TEXT, sort_order INT)
-  -- PK: (word, lesson_id, requirement). requirement: 'recognize' (认识) or 'write' (会写)
-
-test_results (id INTEGER PK AUTO, learner TEXT, word TEXT FK→words, skill TEXT, passed BOOL, tested_at DATETIME, session_title TEXT, session_notes TEXT)
-  -- learner: username string (e.g. 'Ada'). skill: 'read' or 'write'. passed: 1=mastered, 0=needs practice
-  -- To find a learner's failed words: WHERE learner = 'Ada' AND passed = 0
-
-Key relationships:
-- words ←→ word_lessons ←→ lessons (which words in which lessons)
-- To find phrases containing a character: WHERE INSTR(word, '人') > 0 AND length(word) > 1
-- test_results links learner (by username) to words with pass/fail history
-
-To get all words for a textbook: JOIN word_lessons ON lesson_id, filter lessons by grade AND volume.
-To get single characters only: add WHERE length(w.word) = 1.
-To get phrases only: add WHERE length(w.word) > 1.
-
-Common query patterns:
-
-1. "Top N most common characters":
-   SELECT word, pinyin, cumulative_percent FROM words
-   WHERE length(word) = 1 AND cumulative_percent IS NOT NULL ORDER BY cumulative_percent ASC LIMIT N
-
-2. "Words [learner] failed":
-   SELECT DISTINCT w.word, w.pinyin FROM words w
-   JOIN test_results tr ON tr.word = w.word
-   WHERE tr.learner = '...' AND tr.passed = 0
-
-3. "Top N common characters that [learner] failed":
-   SELECT DISTINCT w.word, w.pinyin, w.cumulative_percent FROM words w
-   JOIN test_results tr ON tr.word = w.word
-   WHERE tr.learner = '...' AND tr.passed = 0
-     AND w.word IN (
-       SELECT word FROM words WHERE length(word) = 1 AND cumulative_percent IS NOT NULL
-       ORDER BY cumulative_percent ASC LIMIT N
-     )
-   ORDER BY w.cumulative_percent ASC
-
-Important:
-- A word can have MULTIPLE test_results rows (tested many times). Always use DISTINCT or GROUP BY on word to avoid duplicates.
-- "Top N" means define the pool via subquery first, then apply other filters. The final result may be fewer than N rows.
-"""
-
-SYSTEM_PROMPT = f"""You are a SQL query generator for a Chinese language education knowledge base.
-Given a natural language question, generate a single SQLite SELECT query to answer it.
-
-{DB_SCHEMA}
-
-Rules:
-- Generate ONLY a single SELECT statement. Never generate INSERT, UPDATE, DELETE, DROP, ALTER, or any other modifying statement.
-- Use SQLite syntax.
-- LIMIT results to 200 rows max.
-- Return ONLY the SQL query, no explanation, no markdown, no code fences. Just the raw SQL.
-- The words table contains both single characters ('人') and phrases ('人民'). Use length(word)=1 for characters only, length(word)>1 for phrases only.
-- Lessons contain grade/volume directly. No need for joins to get textbook info. Filter by grade AND volume.
-- When filtering by frequency/commonness, ALWAYS add "cumulative_percent IS NOT NULL" to exclude characters without frequency data.
-- Lower cumulative_percent = more common. "Top N" or "most common N" means ORDER BY cumulative_percent ASC LIMIT N.
-- When the user mentions a learner by name (e.g. "Ada"), filter test_results directly: WHERE learner = 'Ada'. No JOIN needed.
-- Use standard_level for broad filtering (1=常用, 2=次常用, 3=rare). Use cumulative_percent for precise ranking.
-"""
+logger = logging.getLogger(__name__)
 
 UNSAFE_PATTERN = re.compile(
     r'\b(INSERT|UPDATE|DELETE|DROP|ALTER|CREATE|REPLACE|TRUNCATE|GRANT|REVOKE)\b',
@@ -115,40 +37,49 @@ class AskResponse(BaseModel):
     sql: str
     results: list
     row_count: int
+    path: str = "llm"  # "template" when answered locally, "llm" when Bedrock wrote the SQL
+    template: Optional[str] = None
+    params: Optional[dict] = None
+    stats: Optional[dict] = None  # prompt sections, token counts, LLM timings
 
 
 @router.post("/ask", response_model=AskResponse)
 async def ask_question(req: AskRequest, db: AsyncSession = Depends(get_session)):
     """Ask a natural language question about the knowledge base. Returns SQL query and results."""
-    if not BEDROCK_BEARER_TOKEN:
+    started = time.perf_counter()
+    match = await resolve(db, req.question)
+    if match:
+        result = await db.execute(text(match.template.sql), match.params)
+        rows = [dict(r._mapping) for r in result]
+        return AskResponse(
+            question=req.question,
+            sql=match.template.sql,
+            results=rows,
+            row_count=len(rows),
+            path="template",
+            template=match.template.name,
+            params=match.params,
+            stats={"elapsed_ms": round((time.perf_counter() - started) * 1000, 2)},
+        )
+
+    provider = get_provider()
+    if provider is None:
         raise HTTPException(status_code=503, detail="Bedrock API not configured")
 
-    # Call Claude on Bedrock via bearer token auth
+    learners = (await db.execute(text("SELECT DISTINCT learner FROM test_results"))).scalars().all()
+    system, sections = build_system(req.question, learners)
+
+    # The static prompt prefix is cached by Bedrock; see app.core.llm for hedging/failover
     try:
-        import httpx as _httpx
-
-        bedrock_url = f"https://bedrock-runtime.us-west-2.amazonaws.com/model/{BEDROCK_MODEL}/invoke"
-        resp = _httpx.post(
-            bedrock_url,
-            headers={
-                "Authorization": f"Bearer {BEDROCK_BEARER_TOKEN}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1024,
-                "system": SYSTEM_PROMPT,
-                "messages": [{"role": "user", "content": req.question}],
-            },
-            timeout=30,
-        )
-        if resp.status_code != 200:
-            raise Exception(f"Bedrock returned {resp.status_code}: {resp.text[:200]}")
-        message = resp.json()
-        sql = message["content"][0]["text"].strip()
+        llm = await provider.complete(system, req.question)
+        sql = llm.text.strip()
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"LLM error: {str(e)}")
 
+    stats = {"sections": sections, **llm.usage, "ttft_ms": llm.ttft_ms, "llm_ms": llm.total_ms,
+             "provider": llm.provider, "attempts": llm.attempts}
+    logger.info("ask stats: %s", stats)
+
     # Strip markdown code fences if present
     if sql.startswith("```"):
         sql = re.sub(r'^```\w*\n?', '', sql)
@@ -177,6 +108,7 @@ async def ask_question(req: AskRequest, db: AsyncSession = Depends(get_session))
             sql=sql,
             results=rows,
             row_count=len(rows),
+            stats=stats,
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Query execution error: {str(e)}\nSQL: {sql}")
@@ -1,12 +1,18 @@
 """Routes for words (characters + phrases), lesson content, and cumulative queries."""
 
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from pydantic import BaseModel, Field
+from sqlalchemy import delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, col
 
+from app.core.changes import record_change
 from app.core.database import get_session
-from app.models.models import Word, WordLesson, REQUIREMENT_LABELS, Lesson
+from app.core.known_sets import mastered_characters
+from app.core.phrase_index import get_phrase_index, index_word
+from app.models.models import Word, WordChar, WordLesson, REQUIREMENT_LABELS, Lesson
 
 router = APIRouter()
 
@@ -26,6 +32,8 @@ async def list_words(q: str | None = None, db: AsyncSession = Depends(get_sessio
 async def create_word(data: dict, db: AsyncSession = Depends(get_session)):
     word = Word(**data)
     db.add(word)
+    index_word(db, word.word)
+    record_change(db, "words", "insert", word=word.word)
     await db.commit()
     await db.refresh(word)
     return word
@@ -58,8 +66,8 @@ async def get_word(word: str, db: AsyncSession = Depends(get_session)):
     similar = []
     if len(word) == 1:
         phrase_result = await db.exec(
-            select(Word).where(col(Word.word).contains(word))
-            .where(Word.word != word)
+            select(Word)
+            .where(col(Word.word).in_(select(WordChar.word).where(WordChar.char == word)))
             .order_by(func.length(Word.word), func.coalesce(Word.standard_level, 999))
             .limit(10)
         )
@@ -91,6 +99,37 @@ async def get_word(word: str, db: AsyncSession = Depends(get_session)):
     return {**w.model_dump(), "lessons": lessons, "phrases": phrases, "similar": similar}
 
 
+# --- Decodable phrases ---
+
+class DecodableQuery(BaseModel):
+    known: str | list[str] = ""  # known characters, e.g. "天地人大" or ["天", "地"]
+    learner: Optional[str] = None  # add the learner's mastered characters
+    skill: str = "read"
+    limit: int = Field(default=200, ge=1, le=5000)
+
+
+@router.post("/phrases/decodable")
+async def find_decodable_phrases(data: DecodableQuery, db: AsyncSession = Depends(get_session)):
+    """Phrases made only of known characters, most frequent first.
+
+    Uses the word_chars index: a phrase qualifies when every one of its
+    character positions is hit by the known set, so the cost grows with the
+    known characters' postings rather than with the whole vocabulary. Ties in
+    phrase frequency go to the phrase whose rarest character is more common.
+    `count` is the total number of decodable phrases; at most `limit` are
+    returned.
+    """
+    known = set("".join(data.known))
+    if data.learner:
+        known |= await mastered_characters(db, data.learner, data.skill)
+    if not known:
+        raise HTTPException(status_code=400, detail="Provide known characters or a learner")
+
+    index = await get_phrase_index(db)
+    count, phrases = index.decodable(known, data.limit)
+    return {"known_count": len(known), "count": count, "phrases": phrases}
+
+
 # --- Lesson content ---
 
 @router.get("/lessons/{lesson_id}/words")
@@ -119,6 +158,8 @@ async def add_word_to_lesson(
         sort_order=data.get("sort_order", 0),
     )
     db.add(wl)
+    record_change(db, "word_lessons", "insert",
+                  word=wl.word, lesson_id=wl.lesson_id, requirement=wl.requirement)
     await db.commit()
     await db.refresh(wl)
     return wl
@@ -171,12 +212,9 @@ async def get_textbook_words(
 
 @router.delete("/words/{word}", status_code=204)
 async def delete_word(word: str, db: AsyncSession = Depends(get_session)):
-    result = await db.exec(select(Word).where(Word.word == word))
-    w = result.one_or_none()
-    if not w:
+    # Its word_lessons rows go with it (words_delete_cascade trigger)
+    result = await db.execute(delete(Word).where(Word.word == word))
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Word not found")
-    rows = await db.exec(select(WordLesson).where(WordLesson.word == word))
-    for r in rows.all():
-        await db.delete(r)
-    await db.delete(w)
+    record_change(db, "words", "delete", word=word)
     await db.commit()
@@ -4,9 +4,11 @@
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.changes import record_change
 from app.core.database import get_session
 from app.models.models import Lesson
 
@@ -40,6 +42,8 @@ async def list_lessons(grade: int | None = None, volume: int | None = None,
 async def create_lesson(data: LessonCreate, db: AsyncSession = Depends(get_session)):
     lesson = Lesson(**data.model_dump())
     db.add(lesson)
+    await db.flush()
+    record_change(db, "lessons", "insert", id=lesson.id)
     await db.commit()
     await db.refresh(lesson)
     return lesson
@@ -56,9 +60,9 @@ async def get_lesson(lesson_id: int, db: AsyncSession = Depends(get_session)):
 
 @router.delete("/lessons/{lesson_id}", status_code=204)
 async def delete_lesson(lesson_id: int, db: AsyncSession = Depends(get_session)):
-    result = await db.exec(select(Lesson).where(Lesson.id == lesson_id))
-    lesson = result.one_or_none()
-    if not lesson:
+    # Its word_lessons rows go with it (lessons_delete_cascade trigger)
+    result = await db.execute(delete(Lesson).where(Lesson.id == lesson_id))
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Lesson not found")
-    await db.delete(lesson)
+    record_change(db, "lessons", "delete", id=lesson_id)
     await db.commit()
@@ -1,12 +1,15 @@
 """Bulk import routes for populating knowledge base data efficiently."""
 
 from typing import Optional
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from app.core.changes import record_change
 from app.core.database import get_session
+from app.core.phrase_index import index_sql, index_word
 from app.models.models import Lesson, Word, WordLesson
 
 router = APIRouter()
@@ -57,6 +60,8 @@ async def _import_words(
         existing = await db.exec(select(Word).where(Word.word == w.word))
         if not existing.one_or_none():
             db.add(Word(word=w.word, pinyin=w.pinyin))
+            index_word(db, w.word)
+            record_change(db, "words", "insert", word=w.word)
             stats["words"] += 1
 
         existing_wl = await db.exec(
@@ -70,6 +75,8 @@ async def _import_words(
                 word=w.word, lesson_id=lesson_id,
                 requirement=w.requirement, sort_order=i,
             ))
+            record_change(db, "word_lessons", "insert",
+                          word=w.word, lesson_id=lesson_id, requirement=w.requirement)
             stats["word_lessons"] += 1
 
     return stats
@@ -77,7 +84,10 @@ async def _import_words(
 
 @router.post("/import/textbook")
 async def import_textbook(data: FullImport, db: AsyncSession = Depends(get_session)):
-    """Import an entire textbook with all units, lessons, and words."""
+    """Import an entire textbook with all units, lessons, and words.
+
+    Always adds new lessons; use PUT /import/textbook/{grade}/{volume} to replace one.
+    """
     tb = data.textbook
     totals = {"lessons": 0, "words": 0, "word_lessons": 0}
 
@@ -92,6 +102,7 @@ async def import_textbook(data: FullImport, db: AsyncSession = Depends(get_sessi
             )
             db.add(lesson)
             await db.flush()
+            record_change(db, "lessons", "insert", id=lesson.id)
             totals["lessons"] += 1
 
             stats = await _import_words(db, lesson.id, lesson_data.words)
@@ -102,6 +113,150 @@ async def import_textbook(data: FullImport, db: AsyncSession = Depends(get_sessi
     return {"status": "ok", **totals}
 
 
+# --- Atomic textbook replace ---
+
+_STAGING_DDL = [
+    "CREATE TEMP TABLE IF NOT EXISTS staging_lessons ("
+    " unit_number INTEGER, unit_title TEXT, lesson_number INTEGER, title TEXT,"
+    " page_start INTEGER, page_end INTEGER, lesson_id INTEGER,"
+    " PRIMARY KEY (unit_number, lesson_number))",
+    "CREATE TEMP TABLE IF NOT EXISTS staging_words ("
+    " unit_number INTEGER, lesson_number INTEGER, word TEXT, pinyin TEXT,"
+    " requirement TEXT, sort_order INTEGER, lesson_id INTEGER,"
+    " PRIMARY KEY (unit_number, lesson_number, word, requirement))",
+    "DELETE FROM staging_lessons",
+    "DELETE FROM staging_words",
+]
+
+# Lessons of this textbook to drop: not in the new payload, or a duplicate
+# (same unit/lesson number) left behind by an earlier POST import.
+_STALE_LESSONS = """FROM lessons l WHERE l.grade = :grade AND l.volume = :volume AND (
+    NOT EXISTS (SELECT 1 FROM staging_lessons s
+                WHERE s.unit_number = l.unit_number AND s.lesson_number = l.lesson_number)
+    OR l.id > (SELECT MIN(d.id) FROM lessons d WHERE d.grade = l.grade AND d.volume = l.volume
+               AND d.unit_number = l.unit_number AND d.lesson_number = l.lesson_number))"""
+
+_CHANGED_LESSONS = """FROM staging_lessons s
+    WHERE lessons.id = s.lesson_id AND (lessons.unit_title IS NOT s.unit_title
+        OR lessons.title IS NOT s.title OR lessons.page_start IS NOT s.page_start
+        OR lessons.page_end IS NOT s.page_end)"""
+
+_STALE_WORD_LESSONS = """FROM word_lessons wl
+    WHERE wl.lesson_id IN (SELECT lesson_id FROM staging_lessons)
+      AND NOT EXISTS (SELECT 1 FROM staging_words s WHERE s.lesson_id = wl.lesson_id
+                      AND s.word = wl.word AND s.requirement = wl.requirement)"""
+
+_NEW_WORD_LESSONS = """FROM staging_words s WHERE NOT EXISTS (
+    SELECT 1 FROM word_lessons wl WHERE wl.lesson_id = s.lesson_id
+    AND wl.word = s.word AND wl.requirement = s.requirement)"""
+
+_LOG = "INSERT INTO change_log (table_name, row_key, op, changed_at) "
+_WL_KEY = "json_object('lesson_id', {t}.lesson_id, 'requirement', {t}.requirement, 'word', {t}.word)"
+_RESOLVE_LESSON_IDS = """UPDATE staging_lessons SET lesson_id = (
+    SELECT MIN(l.id) FROM lessons l WHERE l.grade = :grade AND l.volume = :volume
+    AND l.unit_number = staging_lessons.unit_number AND l.lesson_number = staging_lessons.lesson_number)
+    WHERE lesson_id IS NULL"""
+
+# (stat, SQL) run in order inside one transaction; stat=None for bookkeeping
+_SWAP = [
+    (None, _LOG + "SELECT 'lessons', json_object('id', l.id), 'delete', CURRENT_TIMESTAMP " + _STALE_LESSONS),
+    ("lessons_deleted", "DELETE FROM lessons WHERE id IN (SELECT l.id " + _STALE_LESSONS + ")"),
+    (None, _RESOLVE_LESSON_IDS),
+    (None, _LOG + "SELECT 'lessons', json_object('id', lessons.id), 'update', CURRENT_TIMESTAMP "
+           "FROM lessons, " + _CHANGED_LESSONS.removeprefix("FROM ")),
+    ("lessons_updated", "UPDATE lessons SET unit_title = s.unit_title, title = s.title, "
+                        "page_start = s.page_start, page_end = s.page_end " + _CHANGED_LESSONS),
+    ("lessons_inserted", "INSERT INTO lessons (grade, volume, unit_number, unit_title, lesson_number, "
+                         "title, page_start, page_end) SELECT :grade, :volume, unit_number, unit_title, "
+                         "lesson_number, title, page_start, page_end FROM staging_lessons "
+                         "WHERE lesson_id IS NULL ORDER BY unit_number, lesson_number"),
+    (None, _LOG + "SELECT 'lessons', json_object('id', l.id), 'insert', CURRENT_TIMESTAMP "
+           "FROM staging_lessons s JOIN lessons l ON l.grade = :grade AND l.volume = :volume "
+           "AND l.unit_number = s.unit_number AND l.lesson_number = s.lesson_number "
+           "WHERE s.lesson_id IS NULL"),
+    (None, _RESOLVE_LESSON_IDS),
+    (None, "UPDATE staging_words SET lesson_id = (SELECT s.lesson_id FROM staging_lessons s "
+           "WHERE s.unit_number = staging_words.unit_number "
+           "AND s.lesson_number = staging_words.lesson_number)"),
+    (None, _LOG + "SELECT 'word_lessons', " + _WL_KEY.format(t="wl") + ", 'delete', CURRENT_TIMESTAMP "
+           + _STALE_WORD_LESSONS),
+    ("word_lessons_deleted", "DELETE FROM word_lessons WHERE rowid IN (SELECT wl.rowid "
+                             + _STALE_WORD_LESSONS + ")"),
+    (None, _LOG + "SELECT DISTINCT 'words', json_object('word', s.word), 'insert', CURRENT_TIMESTAMP "
+           "FROM staging_words s WHERE s.word NOT IN (SELECT word FROM words)"),
+    ("words", "INSERT INTO words (word, pinyin) SELECT word, MAX(pinyin) FROM staging_words "
+              "WHERE word NOT IN (SELECT word FROM words) GROUP BY word"),
+    (None, index_sql("word IN (SELECT word FROM staging_words)")),
+    (None, _LOG + "SELECT 'word_lessons', " + _WL_KEY.format(t="s") + ", 'update', CURRENT_TIMESTAMP "
+           "FROM staging_words s JOIN word_lessons wl ON wl.lesson_id = s.lesson_id "
+           "AND wl.word = s.word AND wl.requirement = s.requirement WHERE wl.sort_order != s.sort_order"),
+    ("word_lessons_updated", "UPDATE word_lessons SET sort_order = s.sort_order FROM staging_words s "
+                             "WHERE word_lessons.lesson_id = s.lesson_id AND word_lessons.word = s.word "
+                             "AND word_lessons.requirement = s.requirement "
+                             "AND word_lessons.sort_order != s.sort_order"),
+    (None, _LOG + "SELECT 'word_lessons', " + _WL_KEY.format(t="s") + ", 'insert', CURRENT_TIMESTAMP "
+           + _NEW_WORD_LESSONS),
+    ("word_lessons_inserted", "INSERT INTO word_lessons (word, lesson_id, requirement, sort_order) "
+                              "SELECT word, lesson_id, requirement, sort_order " + _NEW_WORD_LESSONS),
+]
+
+
+@router.put("/import/textbook/{grade}/{volume}")
+async def replace_textbook(
+    grade: int, volume: int, data: FullImport, db: AsyncSession = Depends(get_session)
+):
+    """Replace a textbook's lessons and word links with the payload, atomically.
+
+    The payload is loaded into TEMP staging tables first (no lock on the main
+    database), then diffed into place with set-based statements in one short
+    write transaction. Lessons are matched by unit/lesson number so their ids
+    survive a re-import; lessons and links missing from the payload are deleted.
+    """
+    tb = data.textbook
+    if (tb.grade, tb.volume) != (grade, volume):
+        raise HTTPException(status_code=400, detail="Payload grade/volume does not match the URL")
+
+    lessons, words, seen = [], [], set()
+    for unit_data in tb.units:
+        for lesson_data in unit_data.lessons:
+            key = (unit_data.unit_number, lesson_data.lesson_number)
+            if key in seen:
+                raise HTTPException(status_code=400, detail=f"Duplicate lesson {key[0]}/{key[1]}")
+            seen.add(key)
+            lessons.append({
+                "unit_number": key[0], "unit_title": unit_data.title, "lesson_number": key[1],
+                "title": lesson_data.title, "page_start": lesson_data.page_start,
+                "page_end": lesson_data.page_end,
+            })
+            words.extend(
+                {"unit_number": key[0], "lesson_number": key[1], "word": w.word,
+                 "pinyin": w.pinyin, "requirement": w.requirement, "sort_order": i}
+                for i, w in enumerate(lesson_data.words)
+            )
+
+    for ddl in _STAGING_DDL:
+        await db.execute(text(ddl))
+    if lessons:
+        await db.execute(text(
+            "INSERT INTO staging_lessons (unit_number, unit_title, lesson_number, title, page_start, page_end) "
+            "VALUES (:unit_number, :unit_title, :lesson_number, :title, :page_start, :page_end)"
+        ), lessons)
+    if words:
+        await db.execute(text(
+            "INSERT OR IGNORE INTO staging_words (unit_number, lesson_number, word, pinyin, requirement, sort_order) "
+            "VALUES (:unit_number, :lesson_number, :word, :pinyin, :requirement, :sort_order)"
+        ), words)
+
+    params = {"grade": grade, "volume": volume}
+    stats = {}
+    for stat, sql in _SWAP:
+        result = await db.execute(text(sql), params)
+        if stat:
+            stats[stat] = result.rowcount
+    await db.commit()
+    return {"status": "ok", **stats}
+
+
 @router.post("/import/lesson")
 async def import_lesson_data(data: LessonDataImport, db: AsyncSession = Depends(get_session)):
     """Import words for an existing lesson."""
@@ -128,20 +283,26 @@ async def import_frequency_data(data: FrequencyImport, db: AsyncSession = Depend
         result = await db.exec(select(Word).where(Word.word == entry.word))
         word = result.one_or_none()
         if word:
+            before = (word.standard_level, word.cumulative_percent, word.pinyin)
             if entry.standard_level is not None:
                 word.standard_level = entry.standard_level
             if entry.cumulative_percent is not None:
                 word.cumulative_percent = entry.cumulative_percent
             if entry.pinyin and not word.pinyin:
                 word.pinyin = entry.pinyin
-            db.add(word)
-            updated += 1
+            # Re-posting an unchanged list must not push clients into a snapshot
+            if (word.standard_level, word.cumulative_percent, word.pinyin) != before:
+                db.add(word)
+                record_change(db, "words", "update", word=word.word)
+                updated += 1
         else:
             db.add(Word(
                 word=entry.word, pinyin=entry.pinyin,
                 standard_level=entry.standard_level,
                 cumulative_percent=entry.cumulative_percent,
             ))
+            index_word(db, entry.word)
+            record_change(db, "words", "insert", word=entry.word)
             created += 1
     await db.commit()
     return {"status": "ok", "created": created, "updated": updated}
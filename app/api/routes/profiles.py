@@ -0,0 +1,40 @@
+"""Profiles captured by the profiling middleware (only mounted when profiling is enabled)."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.profiling import Profile, authorized, profiles
+
+router = APIRouter()
+
+
+def require_token(request: Request) -> None:
+    if not authorized(dict(request.headers), dict(request.query_params)):
+        raise HTTPException(status_code=403, detail="Profiling token required")
+
+
+def _find(profile_id: int) -> Profile:
+    for p in profiles:
+        if p.id == profile_id:
+            return p
+    raise HTTPException(status_code=404, detail="Profile not found (it may have left the buffer)")
+
+
+@router.get("/profiles", dependencies=[Depends(require_token)])
+async def list_profiles():
+    """Captured profiles, newest first."""
+    return [p.summary() for p in reversed(profiles)]
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_token)])
+async def get_profile(profile_id: int):
+    p = _find(profile_id)
+    return {**p.summary(), "statements": p.statements}
+
+
+@router.get("/profiles/{profile_id}/flamegraph", dependencies=[Depends(require_token)])
+async def download_flamegraph(profile_id: int):
+    """Folded stacks weighted in microseconds, for flamegraph.pl, speedscope or inferno."""
+    p = _find(profile_id)
+    return PlainTextResponse(p.folded(), headers={
+        "Content-Disposition": f'attachment; filename="profile-{p.id}.folded"'})
@@ -0,0 +1,115 @@
+"""Delta sync for offline clients.
+
+`GET /sync?since=<version>` streams newline-delimited JSON: a header line with
+the current version, then one line per inserted, updated or deleted row. A
+client that is already up to date receives only the header.
+"""
+
+import json
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.changes import SYNCED_MODELS, collapse_changes, current_version, row_key
+from app.core.config import SYNC_MAX_DELTA
+from app.core.database import get_session
+from app.models.models import ChangeLog
+
+router = APIRouter()
+
+_CHUNK = 500  # keys per IN (...) lookup, well under SQLite's variable limit
+
+
+def _line(obj: dict) -> bytes:
+    return (json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+
+
+def _compact(row) -> dict:
+    return {k: v for k, v in row._mapping.items() if v is not None}
+
+
+async def _snapshot(db: AsyncSession) -> list[tuple[str, str, dict]]:
+    entries = []
+    for table, model in SYNCED_MODELS.items():
+        result = await db.execute(select(model.__table__))
+        entries.extend((table, "insert", _compact(r)) for r in result)
+    return entries
+
+
+async def _fetch_rows(db: AsyncSession, table: str, keys: list[dict]) -> list:
+    t = SYNCED_MODELS[table].__table__
+    pk_cols = list(t.primary_key.columns)
+    rows = []
+    for i in range(0, len(keys), _CHUNK):
+        chunk = keys[i:i + _CHUNK]
+        if len(pk_cols) == 1:
+            cond = pk_cols[0].in_([k[pk_cols[0].name] for k in chunk])
+        else:
+            cond = tuple_(*pk_cols).in_([tuple(k[c.name] for c in pk_cols) for k in chunk])
+        rows.extend((await db.execute(select(t).where(cond))).all())
+    return rows
+
+
+async def _delta(db: AsyncSession, since: int, current: int) -> list[tuple[str, str, dict]] | None:
+    """Net changes in (since, current], or None if a snapshot is cheaper."""
+    result = await db.execute(
+        select(ChangeLog)
+        .where(ChangeLog.version > since, ChangeLog.version <= current)
+        .order_by(ChangeLog.version)
+    )
+    net = collapse_changes(result.scalars().all())
+    if len(net) > SYNC_MAX_DELTA:
+        return None
+
+    # Deletes children-first, then upserts parents-first, so a client with
+    # foreign keys can apply the lines in order.
+    tables = list(SYNCED_MODELS)
+    entries = []
+    upserts: dict[str, dict[str, str]] = {t: {} for t in tables}  # table → {row_key: op}
+    for (table, key), op in sorted(net.items(), key=lambda kv: -tables.index(kv[0][0])):
+        if op == "delete":
+            entries.append((table, op, json.loads(key)))
+        else:
+            upserts[table][key] = op
+
+    # Rows are read back at their current state; a row that vanished without a
+    # logged delete is simply skipped.
+    for table, ops in upserts.items():
+        if not ops:
+            continue
+        pk_names = [c.name for c in SYNCED_MODELS[table].__table__.primary_key.columns]
+        rows = await _fetch_rows(db, table, [json.loads(k) for k in ops])
+        for r in rows:
+            key = row_key(**{n: r._mapping[n] for n in pk_names})
+            entries.append((table, ops[key], _compact(r)))
+    return entries
+
+
+@router.get("/sync")
+async def sync(since: int | None = None, db: AsyncSession = Depends(get_session)):
+    """Changes to lessons, words and word links since a version.
+
+    Omit `since` for a full snapshot. The header line's `version` is the value
+    to send next time (0 while the log is still empty); `snapshot: true` means
+    the client should replace its local tables rather than merge.
+    """
+    current = await current_version(db)
+
+    entries = None
+    if since is not None and 0 <= since <= current:
+        entries = [] if since == current else await _delta(db, since, current)
+    snapshot = entries is None
+    if snapshot:
+        entries = await _snapshot(db)
+
+    def body():
+        yield _line({"version": current, "snapshot": snapshot, "count": len(entries)})
+        for table, op, data in entries:
+            if op == "delete":
+                yield _line({"op": op, "table": table, "key": data})
+            else:
+                yield _line({"op": op, "table": table, "row": data})
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
@@ -0,0 +1,125 @@
+"""Minimal streaming client for Claude on Bedrock (bearer token auth).
+
+Uses `invoke-with-response-stream` so time to first token can be measured.
+The response body is AWS event-stream framing around base64-encoded
+Anthropic streaming events; `_iter_events` decodes it without botocore.
+"""
+
+import base64
+import json
+import struct
+import time
+from dataclasses import dataclass, field
+
+from app.core.config import LLM_TIMEOUT
+
+_HEADER_VALUE_SIZES = {0: 0, 1: 0, 2: 1, 3: 2, 4: 4, 5: 8, 8: 8, 9: 16}  # 6, 7 are length-prefixed
+
+_client = None
+
+
+@dataclass
+class LLMResult:
+    text: str
+    usage: dict = field(default_factory=dict)  # input/output/cache token counts
+    ttft_ms: float | None = None
+    total_ms: float | None = None
+    provider: str | None = None  # which backend/region answered
+    attempts: int = 1  # requests sent, including hedges and failovers
+
+
+class LLMRequestError(Exception):
+    """Rejected as a bad request or bad credentials (4xx other than 429).
+
+    Every region would answer the same way, so it is neither retried elsewhere
+    nor counted against a region's circuit breaker.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        import httpx
+        _client = httpx.AsyncClient(timeout=LLM_TIMEOUT)  # shared so TLS connections are reused
+    return _client
+
+
+def _parse_headers(data: bytes) -> dict:
+    headers, i = {}, 0
+    while i < len(data):
+        name_len = data[i]
+        name = data[i + 1:i + 1 + name_len].decode()
+        i += 1 + name_len
+        kind = data[i]
+        i += 1
+        if kind in (6, 7):
+            (size,) = struct.unpack(">H", data[i:i + 2])
+            i += 2
+            value = data[i:i + size]
+            headers[name] = value.decode() if kind == 7 else value
+            i += size
+        else:
+            headers[name] = kind == 0 if kind in (0, 1) else data[i:i + _HEADER_VALUE_SIZES[kind]]
+            i += _HEADER_VALUE_SIZES[kind]
+    return headers
+
+
+def _iter_events(buffer: bytearray):
+    """Pop complete event-stream messages off `buffer`, yielding (headers, payload)."""
+    while len(buffer) >= 12:
+        total_len, headers_len = struct.unpack(">II", buffer[:8])
+        if len(buffer) < total_len:
+            return
+        headers = _parse_headers(bytes(buffer[12:12 + headers_len]))
+        payload = bytes(buffer[12 + headers_len:total_len - 4])
+        del buffer[:total_len]
+        yield headers, payload
+
+
+async def invoke_stream(
+    region: str, model: str, token: str, system: list[dict], question: str,
+    max_tokens: int = 1024,
+) -> LLMResult:
+    """Send one message and collect the streamed reply."""
+    url = f"https://bedrock-runtime.{region}.amazonaws.com/model/{model}/invoke-with-response-stream"
+    body = {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "system": system,
+        "messages": [{"role": "user", "content": question}],
+    }
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+
+    started = time.perf_counter()
+    result = LLMResult(text="")
+    parts: list[str] = []
+    buffer = bytearray()
+    async with _get_client().stream("POST", url, headers=headers, json=body) as resp:
+        if resp.status_code != 200:
+            text = (await resp.aread()).decode(errors="replace")
+            message = f"Bedrock returned {resp.status_code}: {text[:200]}"
+            if 400 <= resp.status_code < 500 and resp.status_code != 429:
+                raise LLMRequestError(resp.status_code, message)
+            raise Exception(message)
+        async for chunk in resp.aiter_bytes():
+            buffer.extend(chunk)
+            for msg_headers, payload in _iter_events(buffer):
+                if msg_headers.get(":message-type") == "exception":
+                    raise Exception(f"Bedrock stream error: {payload.decode(errors='replace')[:200]}")
+                event = json.loads(base64.b64decode(json.loads(payload)["bytes"]))
+                if event["type"] == "message_start":
+                    result.usage.update(event["message"].get("usage", {}))
+                elif event["type"] == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                    if result.ttft_ms is None:
+                        result.ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                    parts.append(event["delta"]["text"])
+                elif event["type"] == "message_delta":
+                    result.usage.update(event.get("usage", {}))
+
+    result.text = "".join(parts)
+    result.total_ms = round((time.perf_counter() - started) * 1000, 1)
+    return result
@@ -0,0 +1,65 @@
+"""Change log used by the delta sync API.
+
+Every route that writes to a synced table calls `record_change` in the same
+transaction as the write, so the log's version numbers give offline clients a
+monotonically increasing cursor.
+"""
+
+import json
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.models import ChangeLog, Lesson, Word, WordLesson
+
+# table name → model, in the order a client should apply a snapshot
+SYNCED_MODELS = {
+    "lessons": Lesson,
+    "words": Word,
+    "word_lessons": WordLesson,
+}
+
+
+async def current_version(db: AsyncSession, table: str | None = None) -> int:
+    """The latest change version, overall or for one table (0 if none).
+
+    Per-table versions are cache keys for data derived from that table alone.
+    """
+    stmt = select(func.max(ChangeLog.version))
+    if table:
+        stmt = stmt.where(ChangeLog.table_name == table)
+    return (await db.execute(stmt)).scalar() or 0
+
+
+def row_key(**pk) -> str:
+    """Encode a primary key the same way SQLite's json_object() does."""
+    return json.dumps(pk, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def record_change(db: AsyncSession, table: str, op: str, **pk) -> None:
+    """Append a change to the log. Committed together with the caller's write."""
+    db.add(ChangeLog(table_name=table, row_key=row_key(**pk), op=op))
+
+
+def collapse_changes(changes: list[ChangeLog]) -> dict[tuple[str, str], str]:
+    """Reduce an ordered run of changes to one net op per row.
+
+    A row inserted and deleted inside the window is dropped entirely; a row
+    that existed before the window and is still present is an update.
+    """
+    first: dict[tuple[str, str], str] = {}
+    last: dict[tuple[str, str], str] = {}
+    for c in changes:
+        key = (c.table_name, c.row_key)
+        first.setdefault(key, c.op)
+        last[key] = c.op
+
+    net = {}
+    for key, op in last.items():
+        created = first[key] == "insert"
+        if op == "delete":
+            if not created:
+                net[key] = "delete"
+        else:
+            net[key] = "insert" if created else "update"
+    return net
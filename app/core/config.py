@@ -13,3 +13,34 @@ PORT = int(os.environ.get("PORT", 8020))
 
 BEDROCK_BEARER_TOKEN = os.environ.get("AWS_BEARER_TOKEN_BEDROCK", "")
 BEDROCK_MODEL = os.environ.get("BEDROCK_MODEL", "us.anthropic.claude-sonnet-4-20250514-v1:0")
+
+# Deltas touching more rows than this are served as a full snapshot instead
+SYNC_MAX_DELTA = int(os.environ.get("SYNC_MAX_DELTA", 5000))
+
+# Startup slower than this is logged as a warning (see /health for the measured value)
+STARTUP_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 1500))
+
+# --- LLM backend for /ask ---
+# "bedrock" calls Claude on Bedrock; "fake" serves recorded question→SQL pairs (CI, load tests)
+LLM_PROVIDER = os.environ.get("LLM_PROVIDER", "bedrock")
+BEDROCK_REGIONS = [
+    r.strip() for r in os.environ.get("BEDROCK_REGIONS", "us-west-2,us-east-1").split(",") if r.strip()
+]
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 30))  # seconds, across all attempts
+# A duplicate request goes to the next region once the first has run past the
+# observed p95 latency (this value until enough samples exist)
+LLM_HEDGE_MIN_MS = float(os.environ.get("LLM_HEDGE_MIN_MS", 3000))
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", 3))
+LLM_BREAKER_COOLDOWN = float(os.environ.get("LLM_BREAKER_COOLDOWN", 30))  # seconds
+LLM_FAKE_RECORDINGS = os.environ.get("LLM_FAKE_RECORDINGS", "./data/llm_recordings.json")
+
+# --- Per-request profiling (off unless PROFILE_TOKEN is set) ---
+# Requests with `X-Profile: <token>` or `?profile=<token>` are profiled; the
+# token also guards /api/v1/profiles, so sampling requires it too
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))  # 0.01 = 1% of requests
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 1))
+PROFILE_BUFFER_SIZE = int(os.environ.get("PROFILE_BUFFER_SIZE", 50))  # profiles kept in memory
+if PROFILE_SAMPLE_RATE and not PROFILE_TOKEN:
+    raise RuntimeError("PROFILE_SAMPLE_RATE requires PROFILE_TOKEN: sampled profiles "
+                       "can only be downloaded with the token")
@@ -1,17 +1,17 @@
-from sqlmodel import SQLModel
 from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import DATABASE_URL
+from app.core.migrations import migrate
 
 engine = create_async_engine(DATABASE_URL, echo=False)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
-async def init_db():
-    async with engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+async def init_db() -> int:
+    """Apply pending schema migrations. Returns the schema version."""
+    return await migrate(engine)
 
 
 async def get_session():
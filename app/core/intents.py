@@ -0,0 +1,226 @@
+"""Local intent parser for the most common /ask questions.
+
+Questions that fully match one of the patterns below are answered from a
+fixed, parameterized SQL template without calling the LLM. Anything that does
+not match end to end (extra constraints, unknown learner or radical) returns
+None and goes to Bedrock as before.
+"""
+
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+MAX_ROWS = 200
+
+_CN_DIGITS = {"零": 0, "〇": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4,
+              "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_NUM = r"[0-9]+|[零〇一二两三四五六七八九十百]+"
+
+_VOLUMES = {"上": 1, "下": 2}
+_REQUIREMENTS = {"会写": "write", "写": "write", "认识": "recognize", "会认": "recognize",
+                 "认": "recognize", "识": "recognize", "会读": "recognize"}
+# (min_len, max_len) of words.word for the noun the question asks about
+_KINDS = {"字": (1, 1), "生字": (1, 1), "汉字": (1, 1), "character": (1, 1),
+          "characters": (1, 1), "词": (2, 100), "词语": (2, 100), "phrases": (2, 100),
+          "字词": (1, 100), "words": (1, 100)}
+
+# Everyday names for radicals, as stored in words.radical
+RADICAL_NAMES = {
+    "三点水": "氵", "两点水": "冫", "单人旁": "亻", "双人旁": "彳", "提手旁": "扌",
+    "草字头": "艹", "宝盖头": "宀", "竖心旁": "忄", "言字旁": "讠", "口字旁": "口",
+    "木字旁": "木", "绞丝旁": "纟", "金字旁": "钅", "女字旁": "女", "日字旁": "日",
+    "月字旁": "月", "火字旁": "火", "土字旁": "土", "王字旁": "王", "走之底": "辶",
+    "走之旁": "辶", "反文旁": "攵", "禾木旁": "禾", "雨字头": "雨", "心字底": "心",
+    "四点底": "灬", "门字框": "门", "病字旁": "疒", "衣字旁": "衤", "示字旁": "礻",
+    "食字旁": "饣", "米字旁": "米", "山字旁": "山", "目字旁": "目", "石字旁": "石",
+    "虫字旁": "虫", "贝字旁": "贝", "车字旁": "车", "马字旁": "马", "耳刀旁": "阝",
+}
+
+
+@dataclass(frozen=True)
+class Template:
+    name: str
+    sql: str
+    check: str | None = None  # must return a row for the params, else fall back to the LLM
+
+
+@dataclass
+class Match:
+    template: Template
+    params: dict
+
+
+TEXTBOOK_WORDS = Template(
+    name="textbook_words",
+    sql="""SELECT w.word, w.pinyin, wl.requirement, l.unit_number, l.lesson_number, l.title AS lesson_title
+FROM words w
+JOIN word_lessons wl ON wl.word = w.word
+JOIN lessons l ON l.id = wl.lesson_id
+WHERE l.grade = :grade AND l.volume = :volume
+  AND (:requirement IS NULL OR wl.requirement = :requirement)
+  AND length(w.word) BETWEEN :min_len AND :max_len
+ORDER BY l.unit_number, l.lesson_number, wl.sort_order
+LIMIT 200""",
+)
+
+TOP_COMMON = Template(
+    name="top_common_characters",
+    sql="""SELECT word, pinyin, cumulative_percent FROM words
+WHERE length(word) = 1 AND cumulative_percent IS NOT NULL
+ORDER BY cumulative_percent ASC
+LIMIT :n""",
+)
+
+LEARNER_FAILED = Template(
+    name="learner_failed_words",
+    sql="""SELECT DISTINCT w.word, w.pinyin FROM words w
+JOIN test_results tr ON tr.word = w.word
+WHERE tr.learner = :learner AND tr.passed = 0
+  AND length(w.word) BETWEEN :min_len AND :max_len
+ORDER BY w.word
+LIMIT 200""",
+    check="SELECT 1 FROM test_results WHERE learner = :learner LIMIT 1",
+)
+
+RADICAL_CHARACTERS = Template(
+    name="radical_characters",
+    sql="""SELECT word, pinyin, cumulative_percent FROM words
+WHERE radical = :radical AND length(word) = 1
+ORDER BY cumulative_percent IS NULL, cumulative_percent ASC
+LIMIT 200""",
+    check="SELECT 1 FROM words WHERE radical = :radical LIMIT 1",
+)
+
+
+def parse_number(s: str) -> int | None:
+    """Arabic or Chinese numerals up to 999 ("12", "十二", "两百零五")."""
+    if s.isdigit():
+        return int(s)
+    total, digit = 0, None
+    for ch in s:
+        if ch in _CN_DIGITS:
+            digit = _CN_DIGITS[ch]
+        elif ch in "十百":
+            unit = 10 if ch == "十" else 100
+            total += (1 if digit is None else digit) * unit
+            digit = None
+        else:
+            return None
+    return total + (digit or 0)
+
+
+_FILLER = r"(?:请|请问|帮我)?(?:列出|找出|查询|显示|给我|看看)?(?:一下)?(?:所有|全部)?"
+_TAIL = r"(?:有哪些|是哪些|是什么|都有哪些|有什么|列表)?"
+
+_PATTERNS = []
+
+
+def _pattern(regex: str):
+    def register(fn):
+        _PATTERNS.append((re.compile(regex, re.IGNORECASE), fn))
+        return fn
+    return register
+
+
+@_pattern(_FILLER + r"(?P<grade>" + _NUM + r")年级(?P<volume>[上下])(?:册|学期)?(?:所有|全部)?的?"
+          r"(?:要求)?(?P<req>会写|会认|会读|认识|写|认|识)?的?(?P<kind>生字|汉字|字词|词语|字|词)" + _TAIL)
+def _cn_textbook(m):
+    grade = parse_number(m["grade"])
+    min_len, max_len = _KINDS[m["kind"]]
+    if grade is None or not 1 <= grade <= 6:
+        return None
+    return Match(TEXTBOOK_WORDS, {
+        "grade": grade, "volume": _VOLUMES[m["volume"]],
+        "requirement": _REQUIREMENTS.get(m["req"]) if m["req"] else None,
+        "min_len": min_len, "max_len": max_len,
+    })
+
+
+@_pattern(r"(?:(?:list|show)(?: all)? |all )?(?:(?P<req>write|recognize) )?(?P<kind>characters|phrases|words)"
+          r"(?: to (?P<req2>write|recognize))? (?:in|for|from) grade (?P<grade>[1-6]) "
+          r"(?:volume|vol|book|semester) (?P<volume>[12])")
+def _en_textbook(m):
+    min_len, max_len = _KINDS[m["kind"]]
+    return Match(TEXTBOOK_WORDS, {
+        "grade": int(m["grade"]), "volume": int(m["volume"]),
+        "requirement": m["req"] or m["req2"],
+        "min_len": min_len, "max_len": max_len,
+    })
+
+
+@_pattern(_FILLER + r"(?:(?:最常用|最常见)的?(?:前)?(?P<n1>" + _NUM + r")个?(?:汉字|字)"
+          r"|(?:前|top)(?P<n2>" + _NUM + r")个?(?:最)?(?:常用|常见)的?(?:汉字|字)"
+          r"|(?P<n3>" + _NUM + r")个最?(?:常用|常见)的?(?:汉字|字))" + _TAIL)
+def _cn_top(m):
+    n = parse_number(m["n1"] or m["n2"] or m["n3"])
+    return Match(TOP_COMMON, {"n": min(n, MAX_ROWS)}) if n else None
+
+
+@_pattern(r"(?:(?:what are|list|show|give me) )?(?:the )?(?:top (?P<n1>\d+) (?:most )?(?:common|frequent)"
+          r"|(?P<n2>\d+) most (?:common|frequent)) (?:chinese )?characters")
+def _en_top(m):
+    n = int(m["n1"] or m["n2"])
+    return Match(TOP_COMMON, {"n": min(n, MAX_ROWS)}) if n else None
+
+
+@_pattern(_FILLER + r"(?P<learner>[^\s的]+?)(?:没通过|没过|不会|写错|读错|错了|答错|做错|错)的?"
+          r"(?P<kind>生字|汉字|字词|词语|字|词)" + _TAIL)
+def _cn_failed(m):
+    min_len, max_len = _KINDS[m["kind"]]
+    return Match(LEARNER_FAILED, {"learner": m["learner"], "min_len": min_len, "max_len": max_len})
+
+
+@_pattern(r"(?:(?P<kind1>words|characters) (?P<l1>[^\s']+) (?:failed|got wrong|missed)"
+          r"|(?P<l2>[^\s']+?)(?:'s)? failed (?P<kind2>words|characters)"
+          r"|what (?P<kind3>words|characters) did (?P<l3>[^\s']+) (?:fail|get wrong|miss))")
+def _en_failed(m):
+    min_len, max_len = _KINDS[m["kind1"] or m["kind2"] or m["kind3"]]
+    return Match(LEARNER_FAILED, {
+        "learner": m["l1"] or m["l2"] or m["l3"], "min_len": min_len, "max_len": max_len,
+    })
+
+
+# Named radicals come first: "言字旁" is 讠, not 言 via the generic "X字旁" branch
+@_pattern(_FILLER + r"(?:(?:带|含有|有)?(?P<name>" + "|".join(RADICAL_NAMES) + r")的?"
+          r"|(?:部首|偏旁)(?:是|为)(?P<r1>\S)的?"
+          r"|(?:带|含有|有)?(?P<r2>\S)(?:字旁|字头|字底|旁|部)的?)(?:所有)?(?:汉字|字)" + _TAIL)
+def _cn_radical(m):
+    radical = RADICAL_NAMES[m["name"]] if m["name"] else (m["r1"] or m["r2"])
+    return Match(RADICAL_CHARACTERS, {"radical": radical})
+
+
+@_pattern(r"(?:(?:list|show) )?(?:all )?characters with (?:the )?radical ?(?P<r>\S)")
+def _en_radical(m):
+    return Match(RADICAL_CHARACTERS, {"radical": m["r"]})
+
+
+def _normalize(question: str) -> str:
+    q = re.sub(r"[\s?？。.!！,，:：\"'“”‘’「」]+$", "", question.strip())
+    q = re.sub(r"^[\s\"'“”‘’「」]+", "", q)
+    # Collapse whitespace for English, drop it entirely around CJK
+    q = re.sub(r"\s+", " ", q)
+    return re.sub(r"(?<=[^\x00-\x7f])\s+|\s+(?=[^\x00-\x7f])", "", q)
+
+
+def parse_question(question: str) -> Match | None:
+    """Match a question against the fast-path patterns (no DB access)."""
+    q = _normalize(question)
+    for regex, build in _PATTERNS:
+        m = regex.fullmatch(q)
+        if m:
+            match = build(m)
+            if match:
+                return match
+    return None
+
+
+async def resolve(db: AsyncSession, question: str) -> Match | None:
+    """A fast-path match whose parameters check out against the database."""
+    match = parse_question(question)
+    if match and match.template.check:
+        found = await db.execute(text(match.template.check), match.params)
+        if found.first() is None:
+            return None
+    return match
@@ -0,0 +1,35 @@
+"""Sets of characters a reader is assumed to know."""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def mastered_characters(db: AsyncSession, learner: str, skill: str = "read") -> set[str]:
+    """Single characters whose latest `skill` test by `learner` was passed."""
+    result = await db.execute(text("""
+        SELECT word FROM (
+            SELECT word, passed, ROW_NUMBER() OVER (
+                PARTITION BY word ORDER BY tested_at DESC, id DESC) AS rn
+            FROM test_results
+            WHERE learner = :learner AND skill = :skill AND length(word) = 1)
+        WHERE rn = 1 AND passed"""), {"learner": learner, "skill": skill})
+    return set(result.scalars().all())
+
+
+async def curriculum_characters(
+    db: AsyncSession, grade: int, volume: int | None = None, up_to_lesson: int | None = None,
+) -> set[str]:
+    """Characters taught from the first lesson up to a point in the curriculum.
+
+    Includes every earlier grade and volume. Without `volume` the whole grade
+    is included; `up_to_lesson` uses the same unit*100+lesson numbering as the
+    cumulative word queries.
+    """
+    result = await db.execute(text("""
+        SELECT DISTINCT wl.word FROM word_lessons wl
+        JOIN lessons l ON l.id = wl.lesson_id
+        WHERE l.grade < :grade OR (l.grade = :grade AND (
+            :volume IS NULL OR l.volume < :volume OR (l.volume = :volume AND (
+                :up_to_lesson IS NULL OR l.unit_number * 100 + l.lesson_number <= :up_to_lesson))))"""),
+        {"grade": grade, "volume": volume, "up_to_lesson": up_to_lesson})
+    return {c for word in result.scalars() for c in word}
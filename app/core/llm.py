@@ -0,0 +1,184 @@
+"""Pluggable LLM backends for /ask.
+
+`get_provider()` returns the provider selected by `LLM_PROVIDER`:
+
+- "bedrock": one `BedrockRegion` per entry in `BEDROCK_REGIONS`, wrapped in a
+  `HedgedProvider` that sends a duplicate request to the next region once the
+  first has run past the observed p95 latency, fails over immediately on
+  server errors, throttling, timeouts and connection failures, and skips
+  regions whose circuit breaker is open. Client errors (`LLMRequestError`,
+  e.g. an expired token) are returned as-is without failover.
+- "fake": `RecordedProvider`, which answers from a JSON file of recorded
+  question→SQL pairs so CI and load tests can run the full pipeline offline.
+"""
+
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+
+from app.core import config
+from app.core.bedrock import LLMRequestError, LLMResult, invoke_stream
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMProvider(ABC):
+    name: str
+
+    @abstractmethod
+    async def complete(self, system: list[dict], question: str) -> LLMResult:
+        """Return the model's reply to `question` under the given system blocks."""
+
+
+class BedrockRegion(LLMProvider):
+    def __init__(self, region: str, model: str, token: str):
+        self.name = f"bedrock:{region}"
+        self.region, self.model, self.token = region, model, token
+
+    async def complete(self, system: list[dict], question: str) -> LLMResult:
+        return await invoke_stream(self.region, self.model, self.token, system, question)
+
+
+class RecordedProvider(LLMProvider):
+    """Serves recorded replies: `{"question": "sql", ...}` or `[{"question": ..., "sql": ...}]`."""
+
+    name = "fake"
+
+    def __init__(self, path: str):
+        data = json.loads(Path(path).read_text(encoding="utf-8")) if Path(path).exists() else {}
+        if isinstance(data, list):
+            data = {d["question"]: d["sql"] for d in data}
+        self.replies = {q.strip(): sql for q, sql in data.items()}
+
+    async def complete(self, system: list[dict], question: str) -> LLMResult:
+        sql = self.replies.get(question.strip())
+        if sql is None:
+            raise LLMError(f"No recorded reply for question: {question!r}")
+        return LLMResult(text=sql, ttft_ms=0.0, total_ms=0.0, provider=self.name)
+
+
+class CircuitBreaker:
+    """Opens after N consecutive failures; allows a trial call after the cooldown."""
+
+    def __init__(self, failures: int, cooldown: float):
+        self.max_failures, self.cooldown = failures, cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+
+    def available(self) -> bool:
+        return self.opened_at is None or time.monotonic() - self.opened_at >= self.cooldown
+
+    def success(self) -> None:
+        self.failures, self.opened_at = 0, None
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.max_failures:
+            self.opened_at = time.monotonic()
+
+
+class HedgedProvider(LLMProvider):
+    name = "hedged"
+
+    def __init__(self, providers: list[LLMProvider], timeout: float, hedge_min_ms: float,
+                 breaker_failures: int, breaker_cooldown: float):
+        self.providers = providers
+        self.timeout = timeout
+        self.hedge_min_ms = hedge_min_ms
+        self.breakers = {p.name: CircuitBreaker(breaker_failures, breaker_cooldown) for p in providers}
+        self.latencies: deque[float] = deque(maxlen=200)  # recent successful call times, ms
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before hedging: p95 of recent latencies once 20 are known."""
+        if len(self.latencies) < 20:
+            return self.hedge_min_ms / 1000
+        ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1] / 1000
+
+    async def _call(self, provider: LLMProvider, system: list[dict], question: str) -> LLMResult:
+        started = time.perf_counter()
+        try:
+            result = await provider.complete(system, question)
+        except asyncio.CancelledError:
+            raise  # lost a hedge race, or timed out (charged in complete)
+        except LLMRequestError:
+            raise  # our request is at fault, not the region
+        except Exception:
+            self.breakers[provider.name].failure()
+            raise
+        self.breakers[provider.name].success()
+        self.latencies.append((time.perf_counter() - started) * 1000)
+        result.provider = provider.name
+        return result
+
+    async def complete(self, system: list[dict], question: str) -> LLMResult:
+        queue = [p for p in self.providers if self.breakers[p.name].available()]
+        if not queue:
+            raise LLMError("All LLM regions are unavailable (circuit open)")
+
+        pending: set[asyncio.Task] = set()
+        errors: list[str] = []
+        attempts = 0
+
+        def launch():
+            nonlocal attempts
+            provider = queue.pop(0)
+            attempts += 1
+            pending.add(asyncio.create_task(self._call(provider, system, question), name=provider.name))
+
+        try:
+            async with asyncio.timeout(self.timeout):
+                launch()
+                while pending:
+                    done, _ = await asyncio.wait(
+                        pending, timeout=self.hedge_delay() if queue else None,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for task in done:
+                        pending.discard(task)
+                        if task.exception() is None:
+                            result = task.result()
+                            result.attempts = attempts
+                            return result
+                        if isinstance(task.exception(), LLMRequestError):
+                            raise task.exception()  # would fail in every region
+                        errors.append(f"{task.get_name()}: {task.exception()}")
+                    # Hedge if the current attempt is slow; fail over if it errored
+                    if queue and (not done or not pending):
+                        launch()
+        except TimeoutError:
+            errors.append(f"timed out after {self.timeout:g}s")
+            # Still running at the deadline: a hang, which counts against the
+            # region (unlike a hedge that is cancelled because another won)
+            for task in pending:
+                self.breakers[task.get_name()].failure()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise LLMError("; ".join(errors))
+
+
+_provider: LLMProvider | None = None
+
+
+def get_provider() -> LLMProvider | None:
+    """The configured provider, or None if Bedrock is selected but has no credentials."""
+    global _provider
+    if _provider is None:
+        if config.LLM_PROVIDER == "fake":
+            _provider = RecordedProvider(config.LLM_FAKE_RECORDINGS)
+        elif config.BEDROCK_BEARER_TOKEN:
+            _provider = HedgedProvider(
+                [BedrockRegion(r, config.BEDROCK_MODEL, config.BEDROCK_BEARER_TOKEN)
+                 for r in config.BEDROCK_REGIONS],
+                timeout=config.LLM_TIMEOUT,
+                hedge_min_ms=config.LLM_HEDGE_MIN_MS,
+                breaker_failures=config.LLM_BREAKER_FAILURES,
+                breaker_cooldown=config.LLM_BREAKER_COOLDOWN,
+            )
+    return _provider
@@ -0,0 +1,107 @@
+"""Versioned schema migrations.
+
+Applied versions are recorded in `schema_version`. On startup a single SELECT
+compares the recorded version with the latest one here; when they match
+nothing else runs. Each migration must be idempotent so that a database
+created by an older `create_all` (with no version table) can be adopted.
+"""
+
+from sqlalchemy import exc, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from app.core.phrase_index import index_sql
+from app.models import models
+
+
+def _baseline(conn: Connection) -> None:
+    SQLModel.metadata.create_all(conn, tables=[
+        models.Lesson.__table__,
+        models.Word.__table__,
+        models.WordLesson.__table__,
+        models.TestResult.__table__,
+        models.ChangeLog.__table__,
+    ])
+
+
+def _cascade_word_lessons(conn: Connection) -> None:
+    """Delete word_lessons with their lesson or word, logging the cascaded rows for sync."""
+    log_rows = (
+        "INSERT INTO change_log (table_name, row_key, op, changed_at) "
+        "SELECT 'word_lessons', json_object('lesson_id', lesson_id, 'requirement', requirement, "
+        "'word', word), 'delete', CURRENT_TIMESTAMP FROM word_lessons WHERE {cond};"
+    )
+    orphaned = ("lesson_id NOT IN (SELECT id FROM lessons) "
+                "OR word NOT IN (SELECT word FROM words)")
+    conn.execute(text(log_rows.format(cond=orphaned)))
+    conn.execute(text(f"DELETE FROM word_lessons WHERE {orphaned}"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_word_lessons_lesson_id ON word_lessons (lesson_id)"))
+    for parent, cond in (("lessons", "lesson_id = OLD.id"), ("words", "word = OLD.word")):
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {parent}_delete_cascade AFTER DELETE ON {parent} BEGIN "
+            + log_rows.format(cond=cond)
+            + f" DELETE FROM word_lessons WHERE {cond}; END"
+        ))
+
+
+def _word_chars(conn: Connection) -> None:
+    models.WordChar.__table__.create(conn, checkfirst=True)
+    conn.execute(text(index_sql("1")))
+    conn.execute(text(
+        "CREATE TRIGGER IF NOT EXISTS words_delete_index AFTER DELETE ON words BEGIN "
+        "DELETE FROM word_chars WHERE word = OLD.word; END"
+    ))
+
+
+def _change_log_table_index(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_change_log_table_version ON change_log (table_name, version)"))
+
+
+# (version, description, fn) — append only, never renumber
+MIGRATIONS = [
+    (1, "baseline tables", _baseline),
+    (2, "cascade word_lessons deletes", _cascade_word_lessons),
+    (3, "character to phrase index", _word_chars),
+    (4, "per-table change log versions", _change_log_table_index),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def _current_version(conn: Connection) -> int:
+    try:
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+    except exc.OperationalError:  # no such table — pre-migration database
+        return 0
+
+
+def _apply(conn: Connection, current: int) -> int:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, description TEXT, "
+        "applied_at DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    for version, description, fn in MIGRATIONS:
+        if version > current:
+            fn(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, description) VALUES (:v, :d)"),
+                {"v": version, "d": description},
+            )
+            current = version
+    return current
+
+
+async def migrate(engine: AsyncEngine) -> int:
+    """Bring the schema up to date and return its version."""
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_version)
+    if current >= LATEST_VERSION:
+        return current
+    async with engine.begin() as conn:
+        # pysqlite sends no BEGIN of its own (DDL would run in autocommit), so
+        # take the write lock explicitly: a process racing us waits here, then
+        # re-reads the version and finds nothing left to do.
+        await conn.exec_driver_sql("BEGIN IMMEDIATE")
+        return await conn.run_sync(lambda c: _apply(c, _current_version(c)))
@@ -0,0 +1,101 @@
+"""Character → phrase inverted index (`word_chars`).
+
+Every phrase (a word longer than one character) has one row per character
+position. Routes that insert words call `index_word`; set-based paths use
+`index_sql`. Rows are removed with their word by the `words_delete_index`
+trigger.
+
+`get_phrase_index` keeps an in-memory copy for decodable-phrase lookups,
+keyed on the latest `words` change so only word writes invalidate it.
+"""
+
+import asyncio
+import heapq
+from collections import Counter
+from itertools import chain
+
+from sqlalchemy import Row, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.changes import current_version
+from app.models.models import WordChar
+
+
+def index_word(db: AsyncSession, word: str) -> None:
+    """Add index rows for a newly inserted word (flushed with it)."""
+    if len(word) > 1:
+        db.add_all(WordChar(char=c, word=word, position=i) for i, c in enumerate(word))
+
+
+def index_sql(where: str) -> str:
+    """SQL that indexes every phrase in `words` matching `where`."""
+    return f"""WITH RECURSIVE pos(word, i) AS (
+    SELECT word, 1 FROM words WHERE length(word) > 1 AND ({where})
+    UNION ALL SELECT word, i + 1 FROM pos WHERE i < length(word))
+INSERT OR IGNORE INTO word_chars (char, word, position)
+SELECT substr(word, i, 1), word, i - 1 FROM pos"""
+
+
+class PhraseIndex:
+    """In-memory copy of `word_chars` for answering "what can I read?" queries.
+
+    Phrases are numbered by rank (most frequent first, then by rarest
+    character), and each character maps to the ranks of the phrases it occurs
+    in, once per position. Counting hits over the known characters' postings
+    and keeping the phrases whose count equals their length is then a pass
+    over those postings only, and the best N are the N smallest ranks.
+    """
+
+    def __init__(self, version: int, words: dict[str, Row], postings: list[Row]):
+        self.version = version
+        chars_of: dict[str, list[str]] = {}
+        for char, word in postings:
+            chars_of.setdefault(word, []).append(char)
+        pct = {w: r.cumulative_percent for w, r in words.items()}
+
+        keyed = []
+        for word, chars in chars_of.items():
+            if word not in pct:
+                continue
+            known_pcts = [p for p in map(pct.get, chars) if p is not None]
+            rarest = max(known_pcts) if known_pcts else None
+            own = pct[word]
+            keyed.append(((own is None, own or 0, rarest is None, rarest or 0, len(chars), word), rarest))
+        keyed.sort()
+
+        self.phrases = [(words[k[-1]], rarest) for k, rarest in keyed]
+        self.lengths = [k[4] for k, _ in keyed]
+        self.postings: dict[str, list[int]] = {}
+        for rank, (k, _) in enumerate(keyed):
+            for char in chars_of[k[-1]]:
+                self.postings.setdefault(char, []).append(rank)
+
+    def decodable(self, known: set[str], limit: int) -> tuple[int, list[dict]]:
+        """(total number of decodable phrases, the top `limit` of them)."""
+        hits = Counter(chain.from_iterable(self.postings.get(c, ()) for c in known))
+        lengths = self.lengths
+        ranks = [r for r, n in hits.items() if n == lengths[r]]
+        top = (self.phrases[r] for r in heapq.nsmallest(limit, ranks))
+        return len(ranks), [{**row._mapping, "rarest_char_percent": rarest} for row, rarest in top]
+
+
+_index: PhraseIndex | None = None
+_lock = asyncio.Lock()
+
+
+async def get_phrase_index(db: AsyncSession) -> PhraseIndex:
+    """The cached index, rebuilt from `word_chars` after any change to `words`.
+
+    The rebuild takes seconds at large vocabularies, so it runs in a worker
+    thread; requests for other endpoints carry on meanwhile.
+    """
+    global _index
+    version = await current_version(db, "words")
+    async with _lock:
+        if _index is None or _index.version != version:
+            words = await db.execute(text(
+                "SELECT word, pinyin, meaning, standard_level, cumulative_percent FROM words"))
+            postings = await db.execute(text("SELECT char, word FROM word_chars"))
+            _index = await asyncio.to_thread(
+                lambda: PhraseIndex(version, {r.word: r for r in words}, postings.all()))
+    return _index
@@ -0,0 +1,213 @@
+"""Opt-in per-request profiling.
+
+`ProfilingMiddleware` is only installed when `PROFILE_TOKEN` is set, so a
+deployment without it runs no profiling code at all. When installed, a request
+is profiled if it carries `X-Profile: <token>` or `?profile=<token>`, or is
+picked by `PROFILE_SAMPLE_RATE`. Sampling without a token is rejected at
+startup, since the stored profiles could never be downloaded.
+
+A profiled request is traced by a sampling thread that reads the event loop
+thread's stack every `PROFILE_INTERVAL_MS`, weighting each sample by the time
+since the previous one. Statements are timed with engine events, and time the
+loop spends waiting on a statement is attributed to a synthetic `SQL` frame,
+since the query itself runs on the driver's thread. Finished profiles go into
+a ring buffer of `PROFILE_BUFFER_SIZE` and can be downloaded as folded stacks
+(flamegraph.pl, speedscope, inferno).
+
+Only one request is profiled at a time; others run untouched meanwhile. The
+sampler sees the whole event loop, so work from concurrent requests can show
+up in a trace.
+"""
+
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from sqlalchemy import event
+
+from app.core import config
+
+# Inclusive time buckets: a sample counts towards every bucket whose marker
+# appears in its stack, so model_dump inside serialization counts in both.
+_BUCKETS = {
+    "orm_hydration": ("sqlalchemy/orm/loading.py",),
+    "model_dump": ("model_dump (",),
+    "serialization": ("serialize_response (", "jsonable_encoder (", "render (starlette/responses.py"),
+}
+_IDLE = "select (selectors.py"  # event loop waiting for I/O
+_MAX_STATEMENTS = 50
+
+
+@dataclass
+class Profile:
+    id: int
+    method: str
+    path: str
+    reason: str  # "requested" or "sampled"
+    started_at: datetime
+    status: int | None = None
+    total_ms: float = 0.0
+    sql_ms: float = 0.0
+    sql_count: int = 0
+    statements: list[dict] = field(default_factory=list)  # slowest first
+    stacks: Counter = field(default_factory=Counter)  # folded stack → microseconds
+
+    def summary(self) -> dict:
+        sampled = sum(self.stacks.values())
+        buckets = {name: 0 for name in _BUCKETS}
+        idle = 0
+        for stack, us in self.stacks.items():
+            for name, markers in _BUCKETS.items():
+                if any(m in stack for m in markers):
+                    buckets[name] += us
+            if stack.rsplit(";", 1)[-1].startswith(_IDLE):
+                idle += us
+        return {
+            "id": self.id, "method": self.method, "path": self.path, "reason": self.reason,
+            "started_at": self.started_at, "status": self.status, "total_ms": self.total_ms,
+            "sql_ms": round(self.sql_ms, 1), "sql_count": self.sql_count,
+            "sampled_ms": round(sampled / 1000, 1), "idle_ms": round(idle / 1000, 1),
+            **{f"{name}_ms": round(us / 1000, 1) for name, us in buckets.items()},
+        }
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {us}\n" for stack, us in sorted(self.stacks.items()))
+
+
+profiles: deque[Profile] = deque(maxlen=config.PROFILE_BUFFER_SIZE)
+_ids = itertools.count(1)
+_active: Profile | None = None
+_in_flight: str | None = None  # statement the active profile is waiting on
+_prefixes = sorted({p for p in sys.path if p}, key=len, reverse=True)
+
+
+def _short(path: str) -> str:
+    for prefix in _prefixes:
+        if path.startswith(prefix):
+            return path[len(prefix):].lstrip(os.sep)
+    return os.path.basename(path)
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({_short(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: Profile, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.profile, self.thread_id, self.interval = profile, thread_id, interval
+        self.done = threading.Event()
+
+    def run(self) -> None:
+        last = time.perf_counter()
+        while not self.done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = time.perf_counter()
+            if frame is None:
+                continue
+            stack = _fold(frame)
+            statement = _in_flight
+            if statement and stack.rsplit(";", 1)[-1].startswith(_IDLE):
+                stack = f"{stack.rsplit(';', 1)[0]};SQL;{statement}"
+            self.profile.stacks[stack] += int((now - last) * 1_000_000)
+            last = now
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    global _in_flight
+    if _active is not None:
+        conn.info["profile_started"] = time.perf_counter()
+        _in_flight = " ".join(statement.split())[:120].replace(";", ",")
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    global _in_flight
+    started = conn.info.pop("profile_started", None)
+    if _active is None or started is None:
+        return
+    _in_flight = None
+    ms = (time.perf_counter() - started) * 1000
+    _active.sql_ms += ms
+    _active.sql_count += 1
+    _active.statements.append({"sql": " ".join(statement.split())[:500], "ms": round(ms, 2)})
+    if len(_active.statements) > _MAX_STATEMENTS * 2:
+        _active.statements.sort(key=lambda s: -s["ms"])
+        del _active.statements[_MAX_STATEMENTS:]
+
+
+def _clear_in_flight(context) -> None:
+    global _in_flight
+    _in_flight = None
+
+
+def authorized(headers: dict[str, str], query: dict[str, str]) -> bool:
+    """True if the request carries the profiling token (header or query)."""
+    token = config.PROFILE_TOKEN
+    given = headers.get("x-profile") or query.get("profile") or ""
+    return bool(token) and hmac.compare_digest(given.encode(), token.encode())
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, engine, skip_prefix: str = "/api/v1/profiles"):
+        self.app = app
+        self.skip_prefix = skip_prefix
+        self.interval = config.PROFILE_INTERVAL_MS / 1000
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", _before_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_execute)
+        event.listen(sync_engine, "handle_error", _clear_in_flight)
+
+    def _reason(self, scope) -> str | None:
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]}
+        query = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        if "x-profile" in headers or "profile" in query:
+            return "requested" if authorized(headers, query) else None
+        if config.PROFILE_SAMPLE_RATE and random.random() < config.PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        global _active, _in_flight
+        if scope["type"] != "http" or _active is not None or self.skip_prefix in scope["path"]:
+            return await self.app(scope, receive, send)
+        reason = self._reason(scope)
+        if reason is None:
+            return await self.app(scope, receive, send)
+
+        profile = Profile(id=next(_ids), method=scope["method"], path=scope["path"],
+                          reason=reason, started_at=datetime.utcnow())
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = [*message.get("headers", []),
+                                      (b"x-profile-id", str(profile.id).encode())]
+            await send(message)
+
+        _active = profile
+        sampler = _Sampler(profile, threading.get_ident(), self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.done.set()
+            sampler.join()
+            profile.total_ms = round((time.perf_counter() - started) * 1000, 1)
+            profile.statements.sort(key=lambda s: -s["ms"])
+            del profile.statements[_MAX_STATEMENTS:]
+            _active = _in_flight = None
+            profiles.append(profile)
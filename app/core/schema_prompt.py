@@ -0,0 +1,210 @@
+"""System prompt for /ask, assembled from a registry of schema snippets.
+
+The prompt is split in two system blocks:
+
+- a cached block: the static prefix (instructions, rules, the `words` table)
+  plus the snippets marked `cached` (the core tables most questions touch).
+  It is identical on every call and marked for Bedrock prompt caching, which
+  only applies to prefixes of at least `CACHE_MIN_TOKENS`;
+- the remaining snippets relevant to the question, picked by keyword matching
+  against each snippet's vocabulary (plus the names of known learners).
+
+If no snippet matches at all, every optional one is included so the model is
+never starved of schema it might need.
+"""
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+# Minimum cacheable prompt length for Claude Sonnet; shorter prefixes are
+# silently not cached, so cache_control is only set when this is reached.
+CACHE_MIN_TOKENS = 1024
+
+
+@dataclass(frozen=True)
+class Snippet:
+    name: str
+    text: str
+    keywords: tuple[str, ...] = ()
+    requires: tuple[str, ...] = ()  # only included when all of these are selected too
+    learner_names: bool = False  # also triggered by a learner's name
+    cached: bool = False  # always sent, as part of the cached block
+
+
+STATIC_PREFIX = """You are a SQL query generator for a Chinese language education knowledge base.
+Given a natural language question, generate a single SQLite SELECT query to answer it.
+
+Rules:
+- Generate ONLY a single SELECT statement. Never generate INSERT, UPDATE, DELETE, DROP, ALTER, or any other modifying statement.
+- Use SQLite syntax.
+- LIMIT results to 200 rows max.
+- Return ONLY the SQL query, no explanation, no markdown, no code fences. Just the raw SQL.
+- The words table contains both single characters ('人') and phrases ('人民'). Use length(word)=1 for characters only, length(word)>1 for phrases only.
+- A word can have MULTIPLE test_results rows (tested many times). Always use DISTINCT or GROUP BY on word to avoid duplicates.
+- "Top N" means define the pool via subquery first, then apply other filters. The final result may be fewer than N rows.
+
+Tables in the knowledge base SQLite database:
+
+words (word TEXT PK, pinyin TEXT, meaning TEXT, standard_level INT, cumulative_percent REAL, radical TEXT, decomposition TEXT, etymology_type TEXT, phonetic TEXT, semantic TEXT, non_radical TEXT, components TEXT)
+  -- Unified table for both single characters (e.g. '人') and phrases (e.g. '人民')
+  -- Single characters: length(word) = 1. Phrases: length(word) > 1.
+  -- standard_level: 《通用规范汉字表》level — 1=常用(top 3500), 2=次常用(3501-6500), 3=rare(6501+)
+  -- cumulative_percent: cumulative text coverage. LOWER = MORE common.
+"""
+
+SNIPPETS = [
+    Snippet(
+        name="lessons",
+        cached=True,
+        keywords=("年级", "上册", "下册", "册", "课", "单元", "识字", "生字", "会写", "会认",
+                  "认识", "课本", "教材", "grade", "volume", "lesson", "unit", "textbook",
+                  "curriculum", "write", "recognize"),
+        text="""
+lessons (id INTEGER PK AUTO, grade INT, volume INT, unit_number INT, unit_title TEXT, lesson_number INT, title TEXT, page_start INT, page_end INT)
+  -- grade: 1-6. volume: 1=上册, 2=下册. e.g. grade=4, volume=1 = 四年级上册
+  -- unit_title: e.g. '课文（一）', '识字', '汉语拼音（一）'
+  -- Lessons contain grade/volume directly. No need for joins to get textbook info. Filter by grade AND volume.
+
+word_lessons (word TEXT FK→words, lesson_id INT FK→lessons, requirement TEXT, sort_order INT)
+  -- PK: (word, lesson_id, requirement). requirement: 'recognize' (认识) or 'write' (会写)
+  -- words ←→ word_lessons ←→ lessons (which words in which lessons)
+  -- To get all words for a textbook: JOIN word_lessons ON lesson_id, filter lessons by grade AND volume.
+""",
+    ),
+    Snippet(
+        name="frequency",
+        cached=True,
+        keywords=("常用", "常见", "次常用", "频率", "高频", "最多", "前", "common", "frequent",
+                  "frequency", "top", "rare", "popular"),
+        text="""
+Frequency:
+  -- IMPORTANT: many words have NULL cumulative_percent. Always filter with "cumulative_percent IS NOT NULL" when querying by frequency.
+  -- "Top N" or "most common N" = ORDER BY cumulative_percent ASC LIMIT N
+  -- Use standard_level for broad filtering (1=常用, 2=次常用, 3=rare). Use cumulative_percent for precise ranking.
+
+  "Top N most common characters":
+   SELECT word, pinyin, cumulative_percent FROM words
+   WHERE length(word) = 1 AND cumulative_percent IS NOT NULL ORDER BY cumulative_percent ASC LIMIT N
+""",
+    ),
+    Snippet(
+        name="structure",
+        cached=True,
+        keywords=("部首", "偏旁", "旁", "结构", "形声", "象形", "会意", "声旁", "形旁",
+                  "形近", "相似", "部件", "组成", "字形", "radical", "component", "decomposition",
+                  "similar", "phonetic", "semantic", "pictographic", "ideographic", "pictophonetic",
+                  "etymology", "structure"),
+        text="""
+Character structure columns on words (single characters only):
+  -- radical: the character's radical (部首), e.g. '氵' for 河.
+  -- decomposition: IDS decomposition, e.g. '⿰氵可' for 河. ⿰=left-right, ⿱=top-bottom, ⿴=surround, etc.
+  -- etymology_type: 'pictographic' (象形), 'ideographic' (会意), 'pictophonetic' (形声)
+  -- phonetic: the phonetic component for pictophonetic characters, e.g. '可' for 河
+  -- semantic: the semantic component, e.g. '氵' for 河
+  -- non_radical: the distinctive component (decomposition minus radical), e.g. '寺' for 待(⿰彳寺)
+  -- components: space-separated list of ALL sub-characters (recursive). e.g. 待 = '一 丨 十 土 寸 寺 彳'
+  -- To find characters with same radical: WHERE radical = '氵' AND length(word) = 1
+  -- To find characters with same phonetic: WHERE phonetic = '青' AND length(word) = 1
+  -- To find similar-looking characters (形近字): match on non_radical. e.g. for 待, find WHERE non_radical = '寺' → 持诗特等峙侍
+  -- To find characters containing a component: WHERE components LIKE '% 寺 %' OR components LIKE '寺 %' OR components LIKE '% 寺'
+""",
+    ),
+    Snippet(
+        name="phrases",
+        keywords=("词", "组词", "词语", "短语", "包含", "含有", "phrase", "phrases", "containing",
+                  "contain", "compound"),
+        text="""
+word_chars (char TEXT, word TEXT FK→words, position INT)
+  -- Inverted index: one row per character position of every phrase (length(word) > 1). position is 0-based.
+  -- To find phrases containing a character (indexed, no full scan):
+     SELECT DISTINCT w.word, w.pinyin FROM word_chars wc JOIN words w ON w.word = wc.word WHERE wc.char = '人'
+  -- Phrases starting with a character: WHERE wc.char = '人' AND wc.position = 0
+""",
+    ),
+    Snippet(
+        name="learners",
+        cached=True,
+        learner_names=True,
+        keywords=("学生", "孩子", "测试", "考", "错", "没过", "不会", "通过", "掌握", "复习",
+                  "练习", "learner", "student", "test", "tested", "failed", "passed", "mastered",
+                  "practice", "review", "progress"),
+        text="""
+test_results (id INTEGER PK AUTO, learner TEXT, word TEXT FK→words, skill TEXT, passed BOOL, tested_at DATETIME, session_title TEXT, session_notes TEXT)
+  -- learner: username string (e.g. 'Ada'). skill: 'read' or 'write'. passed: 1=mastered, 0=needs practice
+  -- When the user mentions a learner by name (e.g. "Ada"), filter test_results directly: WHERE learner = 'Ada'. No JOIN needed.
+  -- To find a learner's failed words: WHERE learner = 'Ada' AND passed = 0
+
+  "Words [learner] failed":
+   SELECT DISTINCT w.word, w.pinyin FROM words w
+   JOIN test_results tr ON tr.word = w.word
+   WHERE tr.learner = '...' AND tr.passed = 0
+""",
+    ),
+    Snippet(
+        name="learners_frequency",
+        requires=("learners", "frequency"),
+        text="""
+  "Top N common characters that [learner] failed":
+   SELECT DISTINCT w.word, w.pinyin, w.cumulative_percent FROM words w
+   JOIN test_results tr ON tr.word = w.word
+   WHERE tr.learner = '...' AND tr.passed = 0
+     AND w.word IN (
+       SELECT word FROM words WHERE length(word) = 1 AND cumulative_percent IS NOT NULL
+       ORDER BY cumulative_percent ASC LIMIT N
+     )
+   ORDER BY w.cumulative_percent ASC
+""",
+    ),
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: ~4 ASCII characters per token, ~1 token per CJK character."""
+    ascii_chars = sum(1 for c in text if c.isascii())
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+_ASCII_KEYWORD = re.compile(r"[a-z]+")
+_keyword_patterns: dict[Snippet, re.Pattern] = {}
+
+
+def _keyword_pattern(snippet: Snippet) -> re.Pattern:
+    """English keywords match whole words (plural allowed), others as substrings."""
+    if snippet not in _keyword_patterns:
+        alts = [rf"\b{re.escape(k)}s?\b" if _ASCII_KEYWORD.fullmatch(k) else re.escape(k)
+                for k in snippet.keywords]
+        _keyword_patterns[snippet] = re.compile("|".join(alts) or r"(?!)")
+    return _keyword_patterns[snippet]
+
+
+def _mentioned(snippet: Snippet, q: str, learners: Sequence[str]) -> bool:
+    return bool(_keyword_pattern(snippet).search(q)) or (
+        snippet.learner_names and any(n and n.lower() in q for n in learners))
+
+
+def select_snippets(question: str, learners: Sequence[str] = ()) -> list[Snippet]:
+    """Cached snippets plus those whose vocabulary appears in the question, in registry order."""
+    q = question.lower()
+    matched = {s.name for s in SNIPPETS if not s.requires and _mentioned(s, q, learners)}
+    names = matched | {s.name for s in SNIPPETS if s.cached}
+    if not matched:
+        names |= {s.name for s in SNIPPETS if not s.requires}
+    names |= {s.name for s in SNIPPETS if s.requires and matched.issuperset(s.requires)}
+    return [s for s in SNIPPETS if s.name in names]
+
+
+CACHED_TEXT = STATIC_PREFIX + "".join(s.text for s in SNIPPETS if s.cached)
+
+
+def build_system(question: str, learners: Sequence[str] = ()) -> tuple[list[dict], list[str]]:
+    """Bedrock `system` blocks for a question, and the names of the snippets used."""
+    snippets = select_snippets(question, learners)
+    cached = {"type": "text", "text": CACHED_TEXT}
+    if estimate_tokens(CACHED_TEXT) >= CACHE_MIN_TOKENS:
+        cached["cache_control"] = {"type": "ephemeral"}
+    blocks = [cached]
+    dynamic = "".join(s.text for s in snippets if not s.cached)
+    if dynamic:
+        blocks.append({"type": "text", "text": dynamic})
+    return blocks, [s.name for s in snippets]
@@ -0,0 +1,82 @@
+"""Longest-match segmentation of Chinese text against the `words` vocabulary.
+
+The vocabulary is compiled into a character trie once and cached until the
+next change to `words`, so segmenting a passage costs one trie walk per token
+(bounded by the longest word) instead of a query per character.
+"""
+
+import asyncio
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.changes import current_version
+
+_END = ""  # trie key marking the end of a word; never a real character
+_NON_HAN = re.compile("[^\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0003134f]+")
+
+
+def is_han(c: str) -> bool:
+    """CJK unified ideographs, extension A, compatibility ideographs and extensions B+."""
+    return ("\u4e00" <= c <= "\u9fff" or "\u3400" <= c <= "\u4dbf"
+            or "\uf900" <= c <= "\ufaff" or "\U00020000" <= c <= "\U0003134f")
+
+
+def han_chars(passage: str) -> str:
+    """The passage with everything but Han characters removed."""
+    return _NON_HAN.sub("", passage)
+
+
+class Segmenter:
+    def __init__(self, version: int, words: dict[str, str]):
+        self.version = version
+        self.pinyin = words  # word → pinyin
+        self.root: dict = {}
+        for word in words:
+            node = self.root
+            for c in word:
+                node = node.setdefault(c, {})
+            node[_END] = True
+
+    def segment(self, passage: str) -> list[tuple[str, int, bool]]:
+        """Greedy forward maximum matching into (token, offset, in_vocab) tuples.
+
+        At each position the longest vocabulary word starting there is taken;
+        a Han character that starts no word becomes an out-of-vocabulary token.
+        Everything else (punctuation, Latin text, whitespace) is skipped.
+        """
+        tokens = []
+        root, n, i = self.root, len(passage), 0
+        while i < n:
+            node, end, j = root, 0, i
+            while j < n:
+                node = node.get(passage[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    end = j
+            if end:
+                tokens.append((passage[i:end], i, True))
+                i = end
+            else:
+                if is_han(passage[i]):
+                    tokens.append((passage[i], i, False))
+                i += 1
+        return tokens
+
+
+_segmenter: Segmenter | None = None
+_lock = asyncio.Lock()
+
+
+async def get_segmenter(db: AsyncSession) -> Segmenter:
+    """The cached segmenter, rebuilt (in a worker thread) after any change to `words`."""
+    global _segmenter
+    version = await current_version(db, "words")
+    async with _lock:
+        if _segmenter is None or _segmenter.version != version:
+            result = await db.execute(text("SELECT word, pinyin FROM words"))
+            _segmenter = await asyncio.to_thread(lambda: Segmenter(version, dict(result.all())))
+    return _segmenter
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -42,13 +43,20 @@ class Word(SQLModel, table=True):
 
 
 class WordLesson(SQLModel, table=True):
-    __tablename__ = "word_lessons"
+    __tablename__ = "word_lessons"  # rows are deleted with their word or lesson by triggers
     word: str = Field(foreign_key="words.word", primary_key=True)
-    lesson_id: int = Field(foreign_key="lessons.id", primary_key=True)
+    lesson_id: int = Field(foreign_key="lessons.id", primary_key=True, index=True)
     requirement: str = Field(max_length=20, primary_key=True)  # 'recognize' or 'write'
     sort_order: int = Field(default=0)
 
 
+class WordChar(SQLModel, table=True):
+    __tablename__ = "word_chars"  # character → phrase inverted index, one row per position
+    char: str = Field(primary_key=True, max_length=1)
+    word: str = Field(foreign_key="words.word", primary_key=True, max_length=100, index=True)
+    position: int = Field(primary_key=True)  # 0-based
+
+
 # --- Learner activity tracking ---
 
 class TestResult(SQLModel, table=True):
@@ -61,3 +69,18 @@ class TestResult(SQLModel, table=True):
     tested_at: datetime = Field(default_factory=datetime.utcnow)
     session_title: Optional[str] = Field(default=None, max_length=200)
     session_notes: Optional[str] = Field(default=None, max_length=500)
+
+
+# --- Sync change log ---
+
+class ChangeLog(SQLModel, table=True):
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_table_version", "table_name", "version"),  # per-table cache keys
+        {"sqlite_autoincrement": True},  # versions are never reused
+    )
+    version: Optional[int] = Field(default=None, primary_key=True)
+    table_name: str = Field(max_length=50)  # 'lessons', 'words' or 'word_lessons'
+    row_key: str = Field(max_length=300)  # compact JSON of the row's primary key
+    op: str = Field(max_length=10)  # 'insert', 'update' or 'delete'
+    changed_at: datetime = Field(default_factory=datetime.utcnow)
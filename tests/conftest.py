@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so point the app at a scratch database
+# before any test imports it.
+DB_PATH = os.path.join(tempfile.mkdtemp(), "knowledge.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+os.environ.pop("PROFILE_TOKEN", None)
+os.environ.pop("PROFILE_SAMPLE_RATE", None)
+
+_TABLES = ("word_lessons", "word_chars", "test_results", "lessons", "words", "change_log")
+
+
+@pytest.fixture
+def client():
+    """A started app on an emptied database."""
+    from fastapi.testclient import TestClient
+
+    from app.api.main import app
+
+    with TestClient(app) as c:
+        with sqlite3.connect(DB_PATH) as con:
+            for table in _TABLES:
+                con.execute(f"DELETE FROM {table}")
+        yield c
+
+
+@pytest.fixture
+def db(client):
+    """A plain sqlite3 connection for inspecting what the routes wrote."""
+    con = sqlite3.connect(DB_PATH)
+    yield con
+    con.close()
@@ -0,0 +1,52 @@
+from app.core import segmenter
+from app.core.segmenter import Segmenter
+
+TEXTBOOK = {"textbook": {"grade": 1, "volume": 1, "units": [{"unit_number": 1, "title": "识字", "lessons": [
+    {"lesson_number": 1, "title": "天地人", "words": [{"word": "天"}, {"word": "地"}, {"word": "人"}]},
+    {"lesson_number": 2, "title": "金木", "words": [{"word": "金"}, {"word": "木"}]},
+]}]}}
+
+
+def analyze(client, **body) -> dict:
+    return client.post("/api/v1/analyze/text", json=body).json()
+
+
+def test_longest_match():
+    seg = Segmenter(0, {"天": "", "天地": "", "天地人": "", "人民": ""})
+    assert seg.segment("天地人民，abc天地!") == [
+        ("天地人", 0, True), ("民", 3, False), ("天地", 8, True),
+    ]
+
+
+def test_coverage_against_curriculum(client):
+    client.post("/api/v1/import/textbook", json=TEXTBOOK)
+    client.post("/api/v1/words", json={"word": "人民", "pinyin": "rén mín"})
+
+    result = analyze(client, text="天地人民，金木水! 天地", grade=1, volume=1, up_to_lesson=101,
+                     segments=True)
+    assert result["known_count"] == 3
+    (r,) = result["results"]
+    assert r["segments"] == ["天", "地", "人民", "金", "木", "水", "天", "地"]
+    assert (r["chars"], r["known_chars"], r["coverage"]) == (9, 5, 0.5556)
+    assert [w["word"] for w in r["pre_teach"]] == ["人民", "金", "木", "水"]
+    assert r["pre_teach"][0]["pinyin"] == "rén mín"
+    assert r["pre_teach"][-1]["in_vocab"] is False
+
+    batch = analyze(client, text=["金木", "人"], grade=1)
+    assert [r["coverage"] for r in batch["results"]] == [1.0, 1.0]
+    assert client.post("/api/v1/analyze/text", json={"text": "天"}).status_code == 400
+    assert client.post("/api/v1/analyze/text", json={"text": "天", "volume": 1}).status_code == 400
+
+
+def test_segmenter_only_rebuilt_after_word_changes(client):
+    client.post("/api/v1/words", json={"word": "天地"})
+    analyze(client, text="天地", learner="Ada")
+    seg = segmenter._segmenter
+
+    client.post("/api/v1/lessons", json={"grade": 1, "volume": 1, "title": "天地"})
+    analyze(client, text="天地", learner="Ada")
+    assert segmenter._segmenter is seg
+
+    client.post("/api/v1/words", json={"word": "天地人"})
+    assert analyze(client, text="天地人", learner="Ada", segments=True)["results"][0]["segments"] == ["天地人"]
+    assert segmenter._segmenter is not seg
@@ -0,0 +1,103 @@
+import json
+
+
+def sync(client, since: int | None = None) -> tuple[dict, list[dict]]:
+    params = {} if since is None else {"since": since}
+    header, *lines = client.get("/api/v1/sync", params=params).text.splitlines()
+    return json.loads(header), [json.loads(line) for line in lines]
+
+
+def textbook(*lessons: tuple[int, str, list[str]]) -> dict:
+    """Grade 1 volume 1, unit 1, with (lesson_number, title, words) lessons."""
+    return {"textbook": {"grade": 1, "volume": 1, "units": [{
+        "unit_number": 1, "title": "一",
+        "lessons": [
+            {"lesson_number": n, "title": title,
+             "words": [{"word": w, "requirement": "read"} for w in words]}
+            for n, title, words in lessons
+        ],
+    }]}}
+
+
+def lessons(db) -> list[tuple]:
+    return db.execute("SELECT id, lesson_number, title FROM lessons ORDER BY id").fetchall()
+
+
+def links(db) -> list[tuple]:
+    return db.execute("SELECT lesson_id, word FROM word_lessons ORDER BY lesson_id, sort_order").fetchall()
+
+
+def log_count(db) -> int:
+    return db.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
+
+
+def put(client, payload) -> dict:
+    response = client.put("/api/v1/import/textbook/1/1", json=payload)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_put_removes_duplicates_and_keeps_ids(client, db):
+    payload = textbook((1, "天地人", ["天", "地"]), (2, "金木水火土", ["水"]))
+    client.post("/api/v1/import/textbook", json=payload)
+    first = lessons(db)
+    client.post("/api/v1/import/textbook", json=payload)
+    assert len(lessons(db)) == 4
+
+    stats = put(client, payload)
+    assert stats["lessons_deleted"] == 2
+    assert (stats["lessons_inserted"], stats["word_lessons_inserted"]) == (0, 0)
+    assert lessons(db) == first
+    assert links(db) == [(first[0][0], "天"), (first[0][0], "地"), (first[1][0], "水")]
+
+
+def test_put_drops_a_word_link(client, db):
+    put(client, textbook((1, "天地人", ["天", "地"])))
+    (lesson_id, _, _), = lessons(db)
+    since = sync(client)[0]["version"]
+
+    stats = put(client, textbook((1, "天地人", ["天"])))
+    assert stats["word_lessons_deleted"] == 1
+    assert links(db) == [(lesson_id, "天")]
+    _, lines = sync(client, since)
+    assert [(line["op"], line["table"], line["key"]) for line in lines] == [
+        ("delete", "word_lessons", {"lesson_id": lesson_id, "requirement": "read", "word": "地"}),
+    ]
+
+
+def test_repeated_put_is_a_no_op(client, db):
+    payload = textbook((1, "天地人", ["天", "地"]), (2, "金木水火土", ["水"]))
+    put(client, payload)
+    before = log_count(db)
+
+    stats = put(client, payload)
+    assert stats.pop("status") == "ok"
+    assert all(n == 0 for n in stats.values()), stats
+    assert log_count(db) == before
+
+
+def test_delete_lesson_cascades_word_links(client, db):
+    put(client, textbook((1, "天地人", ["天", "地"]), (2, "金木水火土", ["水"])))
+    (first, _, _), (second, _, _) = lessons(db)
+    since = sync(client)[0]["version"]
+
+    assert client.delete(f"/api/v1/lessons/{first}").status_code == 204
+    assert links(db) == [(second, "水")]
+    _, lines = sync(client, since)
+    assert [(line["op"], line["table"]) for line in lines] == [
+        ("delete", "word_lessons"), ("delete", "word_lessons"), ("delete", "lessons"),
+    ]
+
+
+def test_delete_word_cascades_word_links(client, db):
+    put(client, textbook((1, "天地人", ["天", "地"]), (2, "金木水火土", ["天"])))
+    (first, _, _), _ = lessons(db)
+    since = sync(client)[0]["version"]
+
+    assert client.delete("/api/v1/words/天").status_code == 204
+    assert links(db) == [(first, "地")]
+    assert db.execute("SELECT COUNT(*) FROM word_chars WHERE word = '天'").fetchone()[0] == 0
+    _, lines = sync(client, since)
+    assert sorted((line["op"], line["table"]) for line in lines) == [
+        ("delete", "word_lessons"), ("delete", "word_lessons"), ("delete", "words"),
+    ]
@@ -0,0 +1,77 @@
+import pytest
+
+from app.core.intents import MAX_ROWS, RADICAL_NAMES, parse_number, parse_question
+
+
+def parsed(question: str) -> tuple[str, dict] | None:
+    match = parse_question(question)
+    return match and (match.template.name, match.params)
+
+
+@pytest.mark.parametrize("name,radical", sorted(RADICAL_NAMES.items()))
+def test_radical_names(name, radical):
+    assert parsed(f"{name}的字") == ("radical_characters", {"radical": radical})
+    assert parsed(f"列出所有带{name}的汉字") == ("radical_characters", {"radical": radical})
+
+
+@pytest.mark.parametrize("question,radical", [
+    ("部首是口的字", "口"),
+    ("偏旁为氵的汉字", "氵"),
+    ("鸟字旁的字", "鸟"),
+    ("characters with radical 氵", "氵"),
+    ("list all characters with the radical 木", "木"),
+])
+def test_radical_characters(question, radical):
+    assert parsed(question) == ("radical_characters", {"radical": radical})
+
+
+@pytest.mark.parametrize("text,number", [
+    ("12", 12), ("十", 10), ("十二", 12), ("二十", 20), ("九十九", 99),
+    ("一百", 100), ("两百零五", 205), ("三x", None),
+])
+def test_parse_number(text, number):
+    assert parse_number(text) == number
+
+
+@pytest.mark.parametrize("question,params", [
+    ("三年级上册会写的字", {"grade": 3, "volume": 1, "requirement": "write", "min_len": 1, "max_len": 1}),
+    ("请列出六年级下学期认识的生字？", {"grade": 6, "volume": 2, "requirement": "recognize",
+                                 "min_len": 1, "max_len": 1}),
+    ("一年级下册词语有哪些", {"grade": 1, "volume": 2, "requirement": None, "min_len": 2, "max_len": 100}),
+    ("words in grade 2 volume 1", {"grade": 2, "volume": 1, "requirement": None,
+                                   "min_len": 1, "max_len": 100}),
+])
+def test_textbook_words(question, params):
+    assert parsed(question) == ("textbook_words", params)
+
+
+@pytest.mark.parametrize("question,n", [
+    ("最常用的二十个字", 20),
+    ("前两百个常用字", 200),
+    ("最常见的1000个字", MAX_ROWS),
+    ("top 10 most common characters", 10),
+])
+def test_top_common(question, n):
+    assert parsed(question) == ("top_common_characters", {"n": n})
+
+
+@pytest.mark.parametrize("question,params", [
+    ("Ada没通过的字", {"learner": "Ada", "min_len": 1, "max_len": 1}),
+    ("小明写错的词语", {"learner": "小明", "min_len": 2, "max_len": 100}),
+    ("words Ada failed", {"learner": "Ada", "min_len": 1, "max_len": 100}),
+])
+def test_learner_failed(question, params):
+    assert parsed(question) == ("learner_failed_words", params)
+
+
+@pytest.mark.parametrize("question", [
+    "",
+    "今天天气怎么样",
+    "十年级上册的字",  # no such grade
+    "一年级上册会写的字和词",  # extra constraint
+    "三点水的字有多少个",  # count, not a list
+    "how many characters are there",
+    "最常用的零个字",
+])
+def test_no_match(question):
+    assert parse_question(question) is None
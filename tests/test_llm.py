@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.core.bedrock import LLMRequestError, LLMResult
+from app.core.llm import HedgedProvider, LLMError, LLMProvider
+
+
+class Slow(LLMProvider):
+    def __init__(self, name: str, seconds: float, fail: bool = False, error: Exception | None = None):
+        self.name, self.seconds, self.fail, self.error = name, seconds, fail, error
+        self.calls = 0
+
+    async def complete(self, system, question):
+        self.calls += 1
+        await asyncio.sleep(self.seconds)
+        if self.error:
+            raise self.error
+        if self.fail:
+            raise RuntimeError("boom")
+        return LLMResult(text=f"SELECT '{self.name}'")
+
+
+def hedged(*providers, timeout=1.0, hedge_ms=50):
+    return HedgedProvider(list(providers), timeout=timeout, hedge_min_ms=hedge_ms,
+                          breaker_failures=1, breaker_cooldown=60)
+
+
+@pytest.mark.asyncio
+async def test_hang_until_timeout_opens_breakers():
+    provider = hedged(Slow("a", 3), Slow("b", 3), timeout=0.3)
+    with pytest.raises(LLMError, match="timed out"):
+        await provider.complete([], "q")
+    assert provider.breakers["a"].failures == 1
+    assert provider.breakers["b"].failures == 1
+    assert not provider.breakers["a"].available()
+
+
+@pytest.mark.asyncio
+async def test_losing_hedge_is_not_charged():
+    provider = hedged(Slow("a", 0.5), Slow("b", 0.01))
+    result = await provider.complete([], "q")
+    assert (result.provider, result.attempts) == ("b", 2)
+    assert provider.breakers["a"].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_error_fails_over():
+    provider = hedged(Slow("a", 0, fail=True), Slow("b", 0), hedge_ms=10_000)
+    result = await provider.complete([], "q")
+    assert result.provider == "b"
+    assert provider.breakers["a"].failures == 1
+    assert provider.breakers["b"].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried_or_charged():
+    bad = LLMRequestError(403, "Bedrock returned 403: expired token")
+    b = Slow("b", 0)
+    provider = hedged(Slow("a", 0, error=bad), b, hedge_ms=10_000)
+    with pytest.raises(LLMRequestError) as exc:
+        await provider.complete([], "q")
+    assert exc.value.status == 403
+    assert b.calls == 0
+    assert provider.breakers["a"].failures == 0
+
+
+@pytest.mark.asyncio
+async def test_throttling_fails_over():
+    throttled = Exception("Bedrock returned 429: too many requests")
+    provider = hedged(Slow("a", 0, error=throttled), Slow("b", 0), hedge_ms=10_000)
+    result = await provider.complete([], "q")
+    assert result.provider == "b"
+    assert provider.breakers["a"].failures == 1
@@ -0,0 +1,42 @@
+from app.core import phrase_index
+
+
+def decodable(client, **query) -> dict:
+    return client.post("/api/v1/phrases/decodable", json=query).json()
+
+
+def test_decodable_phrases(client):
+    client.post("/api/v1/import/frequency", json={"words": [
+        {"word": "人", "cumulative_percent": 0.5}, {"word": "天", "cumulative_percent": 1.0},
+        {"word": "地", "cumulative_percent": 2.0},
+    ]})
+    for word in ("天地", "人人", "天地人", "大人"):
+        client.post("/api/v1/words", json={"word": word})
+    client.post("/api/v1/test-results", json={"learner": "Ada", "results": [
+        {"word": "人", "skill": "read", "passed": True},
+        {"word": "天", "skill": "read", "passed": True},
+    ]})
+
+    result = decodable(client, known="地", learner="Ada")
+    assert result["count"] == 3
+    # Ties in phrase frequency go to the more common rarest character
+    assert [p["word"] for p in result["phrases"]] == ["人人", "天地", "天地人"]
+    assert decodable(client, known=["天", "地"], limit=1)["phrases"][0]["word"] == "天地"
+
+    client.delete("/api/v1/words/人人")
+    assert [p["word"] for p in decodable(client, known="天地人")["phrases"]] == ["天地", "天地人"]
+    assert client.post("/api/v1/phrases/decodable", json={}).status_code == 400
+
+
+def test_index_only_rebuilt_after_word_changes(client):
+    client.post("/api/v1/words", json={"word": "天地"})
+    decodable(client, known="天地")
+    index = phrase_index._index
+
+    client.post("/api/v1/lessons", json={"grade": 1, "volume": 1, "title": "天地"})
+    decodable(client, known="天地")
+    assert phrase_index._index is index
+
+    client.post("/api/v1/words", json={"word": "地天"})
+    assert decodable(client, known="天地")["count"] == 2
+    assert phrase_index._index is not index
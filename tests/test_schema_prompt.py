@@ -0,0 +1,41 @@
+import pytest
+
+from app.core.schema_prompt import (
+    CACHE_MIN_TOKENS, CACHED_TEXT, SNIPPETS, build_system, estimate_tokens, select_snippets,
+)
+
+OPTIONAL = [s.name for s in SNIPPETS if not s.cached]
+
+
+def optional_names(question: str, learners=()) -> list[str]:
+    return [s.name for s in select_snippets(question, learners) if not s.cached]
+
+
+def test_cached_block_is_cacheable():
+    assert estimate_tokens(CACHED_TEXT) >= CACHE_MIN_TOKENS
+    blocks, _ = build_system("人组词")
+    assert blocks[0] == {"type": "text", "text": CACHED_TEXT, "cache_control": {"type": "ephemeral"}}
+    assert "word_chars" in blocks[1]["text"]
+
+
+@pytest.mark.parametrize("question", ["stop", "community", "latest", "containingly"])
+def test_english_keywords_match_whole_words(question):
+    # No keyword hit, so the fallback includes every optional snippet except pairings
+    assert optional_names(question) == [n for n in OPTIONAL if n != "learners_frequency"]
+
+
+@pytest.mark.parametrize("question,names", [
+    ("phrases containing 人", ["phrases"]),
+    ("人组词", ["phrases"]),
+    ("top 10 most common characters", []),
+    ("Ada failed the most common characters", ["learners_frequency"]),
+    ("小明没过的常用字", ["learners_frequency"]),
+])
+def test_optional_snippets(question, names):
+    assert optional_names(question, ["小明"]) == names
+
+
+def test_no_dynamic_block_when_nothing_optional():
+    blocks, names = build_system("top 10 most common characters")
+    assert len(blocks) == 1
+    assert names == [s.name for s in SNIPPETS if s.cached]
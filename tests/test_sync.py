@@ -0,0 +1,80 @@
+import json
+
+from app.core.changes import collapse_changes
+from app.models.models import ChangeLog
+
+
+def sync(client, since=None) -> tuple[dict, list[dict]]:
+    params = {} if since is None else {"since": since}
+    header, *lines = client.get("/api/v1/sync", params=params).text.splitlines()
+    return json.loads(header), [json.loads(line) for line in lines]
+
+
+def log(*entries: tuple[str, str, str]) -> list[ChangeLog]:
+    return [ChangeLog(table_name=t, row_key=k, op=op) for t, k, op in entries]
+
+
+def test_collapse_changes():
+    net = collapse_changes(log(
+        ("words", "a", "insert"), ("words", "a", "delete"),  # transient: dropped
+        ("words", "b", "insert"), ("words", "b", "update"),  # still new
+        ("words", "c", "update"), ("words", "c", "delete"),  # pre-existing, gone
+        ("words", "d", "update"), ("words", "d", "update"),
+        ("words", "e", "delete"), ("words", "e", "insert"),  # re-created
+        ("lessons", "a", "update"),
+    ))
+    assert net == {
+        ("words", "b"): "insert",
+        ("words", "c"): "delete",
+        ("words", "d"): "update",
+        ("words", "e"): "update",
+        ("lessons", "a"): "update",
+    }
+
+
+def test_empty_log_is_not_resnapshotted(client):
+    header, _ = sync(client)
+    assert header == {"version": 0, "snapshot": True, "count": 0}
+    assert sync(client, 0)[0] == {"version": 0, "snapshot": False, "count": 0}
+
+
+def test_up_to_date_and_future_versions(client):
+    client.post("/api/v1/words", json={"word": "人"})
+    version = sync(client)[0]["version"]
+    assert sync(client, version) == ({"version": version, "snapshot": False, "count": 0}, [])
+    assert sync(client, version + 1)[0]["snapshot"] is True
+
+
+def test_delta_ordering(client):
+    old = client.post("/api/v1/lessons", json={"grade": 1, "volume": 1, "title": "旧"}).json()["id"]
+    client.post("/api/v1/words", json={"word": "旧"})
+    client.post(f"/api/v1/lessons/{old}/words", json={"word": "旧", "requirement": "write"})
+    since = sync(client)[0]["version"]
+
+    new = client.post("/api/v1/lessons", json={"grade": 1, "volume": 1, "title": "新"}).json()["id"]
+    client.post("/api/v1/words", json={"word": "新"})
+    client.post(f"/api/v1/lessons/{new}/words", json={"word": "新", "requirement": "write"})
+    client.delete("/api/v1/words/旧")
+    client.delete(f"/api/v1/lessons/{old}")
+
+    header, lines = sync(client, since)
+    assert header["snapshot"] is False
+    # Deletes children-first, then upserts parents-first
+    assert [(line["op"], line["table"]) for line in lines] == [
+        ("delete", "word_lessons"), ("delete", "words"), ("delete", "lessons"),
+        ("insert", "lessons"), ("insert", "words"), ("insert", "word_lessons"),
+    ]
+    assert lines[0]["key"] == {"lesson_id": old, "requirement": "write", "word": "旧"}
+    assert lines[-1]["row"] == {"word": "新", "lesson_id": new, "requirement": "write", "sort_order": 0}
+
+
+def test_unchanged_frequency_import_logs_nothing(client, db):
+    payload = {"words": [{"word": "人", "pinyin": "rén", "standard_level": 1, "cumulative_percent": 0.5}]}
+    assert client.post("/api/v1/import/frequency", json=payload).json()["created"] == 1
+    before = db.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
+    assert client.post("/api/v1/import/frequency", json=payload).json()["updated"] == 0
+    assert db.execute("SELECT COUNT(*) FROM change_log").fetchone()[0] == before
+
+    payload["words"][0]["cumulative_percent"] = 0.7
+    assert client.post("/api/v1/import/frequency", json=payload).json()["updated"] == 1
+    assert db.execute("SELECT COUNT(*) FROM change_log").fetchone()[0] == before + 1